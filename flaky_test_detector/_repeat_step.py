@@ -0,0 +1,30 @@
+"""
+pytest plugin for fused detection sessions
+
+Loaded with -p, so that pytest-xdist workers load it as well. It tags every
+test repeated by pytest-repeat with its repetition, which then reaches the
+detector through the reports' user_properties, even from xdist workers.
+"""
+
+# user_properties names: the 0-based repetition, and the node ID without
+# the "<step>-<count>" ID that pytest-repeat adds
+REPEAT_STEP = "flaky_detector_repeat_step"
+BASE_NODEID = "flaky_detector_base_nodeid"
+
+# Fixture pytest-repeat parametrizes with the repetition number
+_STEP_FIXTURE = "__pytest_repeat_step_number"
+
+
+def pytest_collection_modifyitems(items):
+    for item in items:
+        callspec = getattr(item, "callspec", None)
+        if callspec is None or _STEP_FIXTURE not in callspec.params:
+            continue
+
+        # pytest-repeat parametrizes last, so its ID ends the callspec ID
+        ids = callspec.id.split("-")
+        other_ids = "-".join(ids[:-2])
+        base_nodeid = item.nodeid[:item.nodeid.rindex("[")] + (f"[{other_ids}]" if other_ids else "")
+
+        item.user_properties.append((REPEAT_STEP, callspec.params[_STEP_FIXTURE]))
+        item.user_properties.append((BASE_NODEID, base_nodeid))
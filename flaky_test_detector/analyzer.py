@@ -3,9 +3,13 @@ Root cause analyzer - Identifies likely causes of test flakiness
 """
 
 import ast
+import functools
+import os
 import re
+import sys
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import List, Dict, Set
+from typing import Iterable, List, Dict, Optional, Set, Tuple
 from dataclasses import dataclass
 from enum import Enum
 
@@ -23,250 +27,397 @@ class FlakinessType(Enum):
     UNKNOWN = "unknown"
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class RootCause:
     """Identified root cause of flakiness"""
     type: FlakinessType
     description: str
-    line_numbers: List[int]
-    code_snippets: List[str]
+    line_numbers: Tuple[int, ...]
+    code_snippets: Tuple[str, ...]
     confidence: float  # 0-1
 
 
+PARSE_ERROR_DESCRIPTION = "Could not parse test file"
+NO_PATTERN_DESCRIPTION = "No obvious flakiness pattern detected"
+
+# Causes without findings never vary, and RootCause is frozen, so these
+# instances are shared instead of rebuilt on every call
+PARSE_ERROR_CAUSE = RootCause(
+    type=FlakinessType.UNKNOWN,
+    description=PARSE_ERROR_DESCRIPTION,
+    line_numbers=(),
+    code_snippets=(),
+    confidence=0.0
+)
+NO_PATTERN_CAUSE = RootCause(
+    type=FlakinessType.UNKNOWN,
+    description=NO_PATTERN_DESCRIPTION,
+    line_numbers=(),
+    code_snippets=(),
+    confidence=0.1
+)
+
+
+# Patterns indicating different types of flakiness
+TIME_PATTERNS = [
+    r'\bdatetime\.now\(\)',
+    r'\btime\.time\(\)',
+    r'\btime\.sleep\(',
+    r'\btimestamp\b',
+    r'\btoday\(\)',
+    r'\butcnow\(\)',
+]
+
+RANDOM_PATTERNS = [
+    r'\buuid\.uuid4\(\)',
+    r'\bgenerate_uuid\(',
+    r'\bgenerate_user_id\(',
+    r'\bshuffle\(',
+    r'\bshuffle_list\(',
+    r'\bchoice\(',
+    r'\brandint\(',
+    r'\brandrange\(',
+    r'\buuid4\(',
+]
+
+CONCURRENCY_PATTERNS = [
+    r'\bThread\(',
+    r'\bPool\(',
+]
+
+ORDER_PATTERNS = [
+    r'\bset\(',
+    r'\bdict\.keys\(\)',
+    r'\bdict\.values\(\)',
+    r'\bdict\.items\(\)',
+    r'\.json\(\)',  # JSON dict ordering can vary
+]
+
+EXTERNAL_PATTERNS = [
+    r'\bhttp',
+    r'\burl',
+    r'\bapi',
+    r'\bopen\(',
+    r'\.read\(',
+    r'\.write\(',
+]
+
+GLOBAL_STATE_PATTERNS = [
+    r'\bglobal\b',  # Also matches comments/docstrings describing global state
+]
+
+# (type, patterns, description, confidence) for every category, in the
+# order causes are reported. Structural patterns (exact float equality,
+# module attribute access such as random.* or sys.*, await, ...) are
+# detected on the AST by _FlakyVisitor instead of the source scan.
+CATEGORIES = [
+    (FlakinessType.TIME_DEPENDENT, TIME_PATTERNS,
+     "Test uses current time/date which changes between runs", 0.9),
+    (FlakinessType.RANDOM_DEPENDENT, RANDOM_PATTERNS,
+     "Test uses random values without setting seed", 0.95),
+    (FlakinessType.CONCURRENCY, CONCURRENCY_PATTERNS,
+     "Test involves threading/async code with potential race conditions", 0.8),
+    (FlakinessType.UNORDERED_COLLECTION, ORDER_PATTERNS,
+     "Test relies on ordering of sets/dicts which is not guaranteed", 0.7),
+    (FlakinessType.EXTERNAL_DEPENDENCY, EXTERNAL_PATTERNS,
+     "Test depends on external resources (network, filesystem, etc.)", 0.6),
+    (FlakinessType.FLOATING_POINT, [],
+     "Test uses exact floating point comparison which may fail due to rounding", 0.85),
+    (FlakinessType.GLOBAL_STATE, GLOBAL_STATE_PATTERNS,
+     "Test modifies global state which may affect other tests", 0.75),
+]
+
+
+def _literal_core(pattern: str) -> Optional[Tuple[bytes, bool, bool]]:
+    """Split a word-bounded literal pattern into (literal, bounded_start, bounded_end)"""
+    bounded_start = pattern.startswith(r'\b')
+    bounded_end = pattern.endswith(r'\b')
+    core = pattern[2 if bounded_start else 0:-2 if bounded_end else None]
+    # ASCII only, matching how \b is checked on the undecoded source
+    if re.fullmatch(r'(?:\\[.()]|[\w ])+', core, re.ASCII):
+        return re.sub(r'\\(.)', r'\1', core).encode('ascii'), bounded_start, bounded_end
+    return None
+
+
+# Substrings every literal of a category contains at least one of. A
+# function containing none of them cannot match that category, so its
+# literals are not searched at all.
+CATEGORY_ANCHORS = {
+    FlakinessType.TIME_DEPENDENT: (b"time", b"today", b"utcnow"),
+    FlakinessType.RANDOM_DEPENDENT: (b"rand", b"uuid", b"shuffle", b"choice", b"generate_user_id"),
+    FlakinessType.CONCURRENCY: (b"Thread(", b"Pool("),
+    FlakinessType.UNORDERED_COLLECTION: (b"set(", b"dict.", b".json()"),
+    FlakinessType.EXTERNAL_DEPENDENCY: (b"http", b"url", b"api", b"open(", b".read(", b".write("),
+    FlakinessType.GLOBAL_STATE: (b"global",),
+}
+
+
+def _build_matchers() -> List[Tuple[FlakinessType, Tuple[bytes, ...],
+                                    List[Tuple[bytes, bool, bool]]]]:
+    """Turn the patterns in CATEGORIES into (type, anchors, literals) matchers"""
+    matchers = []
+    for cat, patterns, _, _ in CATEGORIES:
+        if not patterns:
+            continue
+        anchors = CATEGORY_ANCHORS[cat]
+        literals = []
+        for pattern in patterns:
+            core = _literal_core(pattern)
+            if not core:
+                raise ValueError(f"Pattern is not a word-bounded literal: {pattern!r}")
+            if not any(anchor in core[0] for anchor in anchors):
+                raise ValueError(f"Pattern contains no anchor of {cat.name}: {pattern!r}")
+            literals.append(core)
+        matchers.append((cat, anchors, literals))
+    return matchers
+
+
+# Below this many functions, analyze_many scans in-process: starting a
+# process pool costs more than it saves
+PARALLEL_MIN_FUNCTIONS = 50
+
+# All text patterns are plain ASCII literals guarded by \b. They are
+# located with bytes.find on the undecoded source, which is far cheaper
+# than running a many-way regex alternation at every position, and the
+# word boundaries are checked directly on the neighbouring bytes. No regex
+# engine runs during the scan, so it is linear in the source length with
+# no backtracking.
+LITERAL_PATTERNS = _build_matchers()
+
+
+# Word characters for \b, with the same ASCII rule re uses for bytes
+_WORD_BYTES = frozenset(b"abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789_")
+
+
+def _at_word_boundary(source: bytes, pos: int) -> bool:
+    """Whether \\b would match at pos"""
+    before = pos > 0 and source[pos - 1] in _WORD_BYTES
+    after = pos < len(source) and source[pos] in _WORD_BYTES
+    return before != after
+
+
+def _find_hits(source: bytes) -> List[Tuple[int, FlakinessType]]:
+    """Return (offset, category) of every pattern hit in source"""
+    hits = []
+    for cat, anchors, literals in LITERAL_PATTERNS:
+        if not any(anchor in source for anchor in anchors):
+            continue
+        for literal, bounded_start, bounded_end in literals:
+            pos = source.find(literal)
+            while pos != -1:
+                if ((not bounded_start or _at_word_boundary(source, pos))
+                        and (not bounded_end or _at_word_boundary(source, pos + len(literal)))):
+                    hits.append((pos, cat))
+                pos = source.find(literal, pos + 1)
+    return hits
+
+
+def _has_float_literal(node: ast.AST) -> bool:
+    """Check for a float constant in an expression, not looking into calls"""
+    if isinstance(node, ast.Constant):
+        return isinstance(node.value, float)
+    if isinstance(node, ast.Call):
+        # pytest.approx(0.3) and friends are the fix, not the problem
+        return False
+    return any(_has_float_literal(child) for child in ast.iter_child_nodes(node))
+
+
+# Names whose attributes mark a category, e.g. random.randint or
+# self.__class__.counter. Looking up the name of the accessed object
+# matches real code only, unlike text search, which also hits comments
+# and strings.
+MODULE_ATTRIBUTE_TYPES = {
+    'random': FlakinessType.RANDOM_DEPENDENT,
+    'threading': FlakinessType.CONCURRENCY,
+    'asyncio': FlakinessType.CONCURRENCY,
+    'multiprocessing': FlakinessType.CONCURRENCY,
+    'requests': FlakinessType.EXTERNAL_DEPENDENCY,
+    'socket': FlakinessType.EXTERNAL_DEPENDENCY,
+    'sys': FlakinessType.GLOBAL_STATE,
+    '__class__': FlakinessType.GLOBAL_STATE,
+}
+
+
+class _FlakyVisitor(ast.NodeVisitor):
+    """Collects lines of structural flakiness patterns in a function"""
+
+    def __init__(self):
+        self.found: Dict[FlakinessType, Set[int]] = {}
+
+    def scan(self, func: ast.FunctionDef) -> Dict[FlakinessType, Set[int]]:
+        """Visit function signature and body, skipping decorators"""
+        self.visit(func.args)
+        for stmt in func.body:
+            self.visit(stmt)
+        return self.found
+
+    def _add(self, cat: FlakinessType, node: ast.AST) -> None:
+        self.found.setdefault(cat, set()).add(node.lineno)
+
+    def visit_Assert(self, node: ast.Assert) -> None:
+        test = node.test
+        if isinstance(test, ast.Compare) and any(isinstance(op, ast.Eq) for op in test.ops):
+            if any(_has_float_literal(operand) for operand in [test.left, *test.comparators]):
+                self._add(FlakinessType.FLOATING_POINT, node)
+        self.generic_visit(node)
+
+    def visit_Call(self, node: ast.Call) -> None:
+        func = node.func
+        name = func.attr if isinstance(func, ast.Attribute) else getattr(func, 'id', None)
+        if name == 'assertEqual' and any(_has_float_literal(arg) for arg in node.args):
+            self._add(FlakinessType.FLOATING_POINT, node)
+        self.generic_visit(node)
+
+    def visit_Attribute(self, node: ast.Attribute) -> None:
+        value = node.value
+        name = value.id if isinstance(value, ast.Name) else getattr(value, 'attr', None)
+        cat = MODULE_ATTRIBUTE_TYPES.get(name)
+        if cat:
+            self._add(cat, node)
+        elif name == 'os' and node.attr.startswith('environ'):
+            self._add(FlakinessType.GLOBAL_STATE, node)
+        self.generic_visit(node)
+
+    def visit_Await(self, node: ast.Await) -> None:
+        self._add(FlakinessType.CONCURRENCY, node)
+        self.generic_visit(node)
+
+    def visit_AsyncFunctionDef(self, node: ast.AsyncFunctionDef) -> None:
+        self._add(FlakinessType.CONCURRENCY, node)
+        self.generic_visit(node)
+
+
+def _scan_function(func_lines: List[bytes], test_func: ast.FunctionDef) -> List[RootCause]:
+    """Find flakiness causes in one function, given its lines and AST node"""
+    causes = []
+    func_start_line = test_func.lineno
+    func_source = b'\n'.join(func_lines)
+
+    # Line numbers hit per category: text patterns from one scan over
+    # the source, structural ones from the AST
+    found = _FlakyVisitor().scan(test_func)
+
+    # Walk the text hits in source order, counting only the newlines
+    # between consecutive hits to track the line number
+    line_num = func_start_line
+    prev_offset = 0
+    for offset, cat in sorted(_find_hits(func_source), key=lambda hit: hit[0]):
+        line_num += func_source.count(b'\n', prev_offset, offset)
+        prev_offset = offset
+        found.setdefault(cat, set()).add(line_num)
+
+    for cat, _, description, confidence in CATEGORIES:
+        line_numbers = tuple(sorted(found.get(cat, ())))
+        if line_numbers:
+            causes.append(RootCause(
+                type=cat,
+                description=description,
+                line_numbers=line_numbers,
+                # Interned: the same line (time.sleep(...), random.seed(42), ...)
+                # tends to recur across many tests of a suite
+                code_snippets=tuple(
+                    sys.intern(func_lines[n - func_start_line].strip().decode('utf-8', 'replace'))
+                    for n in line_numbers
+                ),
+                confidence=confidence
+            ))
+
+    return causes if causes else [NO_PATTERN_CAUSE]
+
+
+@functools.lru_cache(maxsize=64)
+def _load(path_str: str, mtime_ns: int) -> Tuple[bytes, Optional[ast.Module], List[bytes],
+                                                 Dict[str, ast.FunctionDef]]:
+    """Read, parse, split and index a test file once per (path, mtime)"""
+    # Kept as bytes: the patterns are ASCII, so only the reported snippets
+    # ever need decoding, and ast.parse handles the coding declaration
+    source = Path(path_str).read_bytes()
+    try:
+        tree = ast.parse(source)
+    except SyntaxError:
+        tree = None
+
+    # Index function definitions by name; like the breadth-first walk this
+    # replaces, the outermost definition of a name wins
+    funcs: Dict[str, ast.FunctionDef] = {}
+    if tree:
+        for node in ast.walk(tree):
+            if isinstance(node, ast.FunctionDef):
+                funcs.setdefault(node.name, node)
+
+    # bytes.splitlines() breaks on exactly the newlines ast counts
+    return source, tree, source.splitlines(), funcs
+
+
+@functools.lru_cache(maxsize=4096)
+def _analyze_cached(path_str: str, mtime_ns: int, func_name: str) -> Tuple[RootCause, ...]:
+    """Analyze one function of a parsed file, memoized per (path, mtime, name)"""
+    _, _, lines, funcs = _load(path_str, mtime_ns)
+    test_func = funcs.get(func_name)
+    if not test_func:
+        return ()
+    # Slice the function's lines from the file, which avoids
+    # ast.get_source_segment re-splitting the whole module
+    func_lines = lines[test_func.lineno - 1:test_func.end_lineno]
+    return tuple(_scan_function(func_lines, test_func))
+
+
 class RootCauseAnalyzer:
     """Analyzes test code to identify likely causes of flakiness"""
 
-    # Patterns indicating different types of flakiness
-    TIME_PATTERNS = [
-        r'\bdatetime\.now\(\)',
-        r'\btime\.time\(\)',
-        r'\btime\.sleep\(',
-        r'\btimestamp\b',
-        r'\btoday\(\)',
-        r'\butcnow\(\)',
-    ]
-
-    RANDOM_PATTERNS = [
-        r'\brandom\.',
-        r'\buuid\.uuid4\(\)',
-        r'\bgenerate_uuid\(',
-        r'\bgenerate_user_id\(',
-        r'\bshuffle\(',
-        r'\bshuffle_list\(',
-        r'\bchoice\(',
-        r'\brandint\(',
-        r'\brandrange\(',
-        r'\buuid4\(',
-    ]
-
-    CONCURRENCY_PATTERNS = [
-        r'\bthreading\.',
-        r'\bThread\(',
-        r'\basyncio\.',
-        r'\basync def\b',
-        r'\bawait\b',
-        r'\bmultiprocessing\.',
-        r'\bPool\(',
-    ]
-
-    ORDER_PATTERNS = [
-        r'\bset\(',
-        r'\bdict\.keys\(\)',
-        r'\bdict\.values\(\)',
-        r'\bdict\.items\(\)',
-        r'\.json\(\)',  # JSON dict ordering can vary
-    ]
-
-    EXTERNAL_PATTERNS = [
-        r'\brequests\.',
-        r'\bhttp',
-        r'\burl',
-        r'\bapi',
-        r'\bsocket\.',
-        r'\bopen\(',
-        r'\.read\(',
-        r'\.write\(',
-    ]
-
-    FLOAT_PATTERNS = [
-        r'assert.*==.*\d+\.\d+',
-        r'assertEqual.*\d+\.\d+',
-    ]
-
-    GLOBAL_STATE_PATTERNS = [
-        r'\bglobal\b',
-        r'\b__class__\.',
-        r'\bsys\.',
-        r'\bos\.environ',
-    ]
-
     def __init__(self, test_file: Path):
         self.test_file = test_file
-        self.source_code = ""
+        self.source_bytes = b""
         self.tree = None
+        self.lines: List[bytes] = []
+        self._funcs: Dict[str, ast.FunctionDef] = {}
+        self._mtime_ns = 0
 
         if test_file.exists():
-            self.source_code = test_file.read_text()
-            try:
-                self.tree = ast.parse(self.source_code)
-            except SyntaxError:
-                pass
+            # Analyzers are often created per test function, so reuse the
+            # parse of an unchanged file
+            self._mtime_ns = test_file.stat().st_mtime_ns
+            self.source_bytes, self.tree, self.lines, self._funcs = _load(
+                str(test_file), self._mtime_ns
+            )
 
     def analyze(self, test_function_name: str) -> List[RootCause]:
         """Analyze a specific test function for flakiness causes"""
         if not self.tree:
-            return [RootCause(
-                type=FlakinessType.UNKNOWN,
-                description="Could not parse test file",
-                line_numbers=[],
-                code_snippets=[],
-                confidence=0.0
-            )]
-
-        # Extract the test function
-        test_func = self._find_function(test_function_name)
-        if not test_func:
-            return []
-
-        causes = []
-
-        # Extract function source
-        func_source = ast.get_source_segment(self.source_code, test_func)
-        if not func_source:
-            return []
-
-        func_lines = func_source.split('\n')
-        func_start_line = test_func.lineno
-
-        # Check for different patterns
-        causes.extend(self._check_time_dependency(func_source, func_lines, func_start_line))
-        causes.extend(self._check_random_dependency(func_source, func_lines, func_start_line))
-        causes.extend(self._check_concurrency(func_source, func_lines, func_start_line))
-        causes.extend(self._check_order_dependency(func_source, func_lines, func_start_line))
-        causes.extend(self._check_external_dependency(func_source, func_lines, func_start_line))
-        causes.extend(self._check_floating_point(func_source, func_lines, func_start_line))
-        causes.extend(self._check_global_state(func_source, func_lines, func_start_line))
-
-        return causes if causes else [RootCause(
-            type=FlakinessType.UNKNOWN,
-            description="No obvious flakiness pattern detected",
-            line_numbers=[],
-            code_snippets=[],
-            confidence=0.1
-        )]
-
-    def _find_function(self, func_name: str) -> ast.FunctionDef:
+            return [PARSE_ERROR_CAUSE]
+
+        # The result only depends on the file contents and the function,
+        # so repeated passes over the same test are served from the cache
+        return list(_analyze_cached(str(self.test_file), self._mtime_ns, test_function_name))
+
+    @classmethod
+    def analyze_many(cls, test_file: Path, test_function_names: Iterable[str],
+                     max_workers: Optional[int] = None) -> Dict[str, List[RootCause]]:
+        """Analyze several test functions of one file, in parallel for large batches"""
+        analyzer = cls(test_file)
+        names = list(dict.fromkeys(test_function_names))
+        if not analyzer.tree:
+            return {name: analyzer.analyze(name) for name in names}
+
+        jobs = [(name, func) for name in names if (func := analyzer._find_function(name))]
+        results: Dict[str, List[RootCause]] = {name: [] for name in names}
+
+        # The file is parsed once here; workers only get each function's
+        # lines and node, and the scan itself is pure CPU work
+        slices = [analyzer.lines[func.lineno - 1:func.end_lineno] for _, func in jobs]
+        nodes = [func for _, func in jobs]
+        if max_workers == 1 or len(jobs) < PARALLEL_MIN_FUNCTIONS:
+            scanned = map(_scan_function, slices, nodes)
+        else:
+            workers = max_workers or os.cpu_count() or 1
+            chunksize = max(1, len(jobs) // (workers * 4))
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                scanned = list(pool.map(_scan_function, slices, nodes, chunksize=chunksize))
+
+        for (name, _), causes in zip(jobs, scanned):
+            results[name] = causes
+        return results
+
+    def _find_function(self, func_name: str) -> Optional[ast.FunctionDef]:
         """Find function definition in AST"""
-        for node in ast.walk(self.tree):
-            if isinstance(node, ast.FunctionDef) and node.name == func_name:
-                return node
-        return None
-
-    def _check_pattern(self, source: str, patterns: List[str],
-                       lines: List[str], start_line: int) -> List[tuple]:
-        """Check for pattern matches and return (line_num, snippet) tuples"""
-        matches = []
-        for i, line in enumerate(lines):
-            for pattern in patterns:
-                if re.search(pattern, line):
-                    matches.append((start_line + i, line.strip()))
-                    break
-        return matches
-
-    def _check_time_dependency(self, source: str, lines: List[str],
-                                start_line: int) -> List[RootCause]:
-        """Check for time-dependent code"""
-        matches = self._check_pattern(source, self.TIME_PATTERNS, lines, start_line)
-        if matches:
-            return [RootCause(
-                type=FlakinessType.TIME_DEPENDENT,
-                description="Test uses current time/date which changes between runs",
-                line_numbers=[m[0] for m in matches],
-                code_snippets=[m[1] for m in matches],
-                confidence=0.9
-            )]
-        return []
-
-    def _check_random_dependency(self, source: str, lines: List[str],
-                                  start_line: int) -> List[RootCause]:
-        """Check for random number generation"""
-        matches = self._check_pattern(source, self.RANDOM_PATTERNS, lines, start_line)
-        if matches:
-            return [RootCause(
-                type=FlakinessType.RANDOM_DEPENDENT,
-                description="Test uses random values without setting seed",
-                line_numbers=[m[0] for m in matches],
-                code_snippets=[m[1] for m in matches],
-                confidence=0.95
-            )]
-        return []
-
-    def _check_concurrency(self, source: str, lines: List[str],
-                           start_line: int) -> List[RootCause]:
-        """Check for concurrency issues"""
-        matches = self._check_pattern(source, self.CONCURRENCY_PATTERNS, lines, start_line)
-        if matches:
-            return [RootCause(
-                type=FlakinessType.CONCURRENCY,
-                description="Test involves threading/async code with potential race conditions",
-                line_numbers=[m[0] for m in matches],
-                code_snippets=[m[1] for m in matches],
-                confidence=0.8
-            )]
-        return []
-
-    def _check_order_dependency(self, source: str, lines: List[str],
-                                 start_line: int) -> List[RootCause]:
-        """Check for unordered collection usage"""
-        matches = self._check_pattern(source, self.ORDER_PATTERNS, lines, start_line)
-        if matches:
-            return [RootCause(
-                type=FlakinessType.UNORDERED_COLLECTION,
-                description="Test relies on ordering of sets/dicts which is not guaranteed",
-                line_numbers=[m[0] for m in matches],
-                code_snippets=[m[1] for m in matches],
-                confidence=0.7
-            )]
-        return []
-
-    def _check_external_dependency(self, source: str, lines: List[str],
-                                    start_line: int) -> List[RootCause]:
-        """Check for external dependencies"""
-        matches = self._check_pattern(source, self.EXTERNAL_PATTERNS, lines, start_line)
-        if matches:
-            return [RootCause(
-                type=FlakinessType.EXTERNAL_DEPENDENCY,
-                description="Test depends on external resources (network, filesystem, etc.)",
-                line_numbers=[m[0] for m in matches],
-                code_snippets=[m[1] for m in matches],
-                confidence=0.6
-            )]
-        return []
-
-    def _check_floating_point(self, source: str, lines: List[str],
-                               start_line: int) -> List[RootCause]:
-        """Check for floating point comparisons"""
-        matches = self._check_pattern(source, self.FLOAT_PATTERNS, lines, start_line)
-        if matches:
-            return [RootCause(
-                type=FlakinessType.FLOATING_POINT,
-                description="Test uses exact floating point comparison which may fail due to rounding",
-                line_numbers=[m[0] for m in matches],
-                code_snippets=[m[1] for m in matches],
-                confidence=0.85
-            )]
-        return []
-
-    def _check_global_state(self, source: str, lines: List[str],
-                            start_line: int) -> List[RootCause]:
-        """Check for global state modification"""
-        matches = self._check_pattern(source, self.GLOBAL_STATE_PATTERNS, lines, start_line)
-        if matches:
-            return [RootCause(
-                type=FlakinessType.GLOBAL_STATE,
-                description="Test modifies global state which may affect other tests",
-                line_numbers=[m[0] for m in matches],
-                code_snippets=[m[1] for m in matches],
-                confidence=0.75
-            )]
-        return []
+        return self._funcs.get(func_name)
@@ -4,17 +4,298 @@ Supports GitHub Actions and GitLab CI
 """
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import json
+import hashlib
+import os
+import re
+import sqlite3
+import sys
+import threading
+import time
 from pathlib import Path
-from typing import List, Dict, Optional
+from typing import Iterable, List, Dict, Optional, Set, Tuple
+from urllib.parse import parse_qs, urlsplit
 from dataclasses import dataclass, field
-from datetime import datetime, timedelta
-from collections import defaultdict
+from functools import cached_property
+from datetime import date, datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
 import zipfile
 import io
 
 
-@dataclass
+# Upper bound on simultaneous API requests, kept low to stay clear of
+# GitHub's secondary rate limits
+MAX_CONCURRENT_FETCHES = 8
+
+
+def _fetch_concurrently(fetch, items: List, max_workers: int = MAX_CONCURRENT_FETCHES,
+                        key=None) -> Dict:
+    """Call fetch for every item on a thread pool and map each item to its result
+
+    Items are mapped by key(item) instead where key is given, for items
+    that are not hashable themselves.
+    """
+    if not items:
+        return {}
+    keys = items if key is None else [key(item) for item in items]
+    # Fetches spend nearly all their time waiting on the network, so
+    # threads overlap the round trips despite the GIL
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(items))) as pool:
+        return dict(zip(keys, pool.map(fetch, items)))
+
+
+# A pytest result line, "path::test STATUS [...]", optionally behind one
+# prefix token such as the timestamps GitHub Actions adds to each line.
+# Matched on the raw log bytes: pytest's result lines are ASCII apart
+# from the test ID, so only matched IDs are ever decoded.
+_PYTEST_RESULT_RE = re.compile(
+    rb'^(?:\S+[ \t]+)?(\S+::\S+)[ \t]+(PASSED|FAILED|SKIPPED|ERROR)\b', re.MULTILINE
+)
+
+# ANSI color codes CI runners may leave in the output
+_ANSI_RE = re.compile(rb'\x1b\[[0-9;]*m')
+
+
+def parse_pytest_output(logs: bytes) -> List[Dict]:
+    """Extract test results from pytest output in CI logs"""
+    if b'\x1b' in logs:
+        logs = _ANSI_RE.sub(b'', logs)
+
+    # One regex pass over the whole log instead of splitting it into
+    # lines and testing each of them
+    tests = []
+    for match in _PYTEST_RESULT_RE.finditer(logs):
+        test_id = match.group(1).decode('utf-8', errors='replace')
+        tests.append({
+            # Interned: the same name recurs in every run and keys the
+            # per-test aggregation
+            'test_name': sys.intern(test_id.rsplit('::', 1)[-1]),
+            'test_id': test_id,
+            'status': match.group(2).decode('ascii').lower()
+        })
+    return tests
+
+
+def _make_session(headers: Dict[str, str]) -> requests.Session:
+    """Create a session that keeps connections alive and retries transient errors"""
+    # One session per analyzer: every request after the first reuses a
+    # pooled connection instead of a new TCP and TLS handshake. The pool
+    # is larger than MAX_CONCURRENT_FETCHES so fetch threads never wait
+    # for a connection. requests already asks for gzip-compressed bodies.
+    session = requests.Session()
+    session.headers.update(headers)
+    retry = Retry(total=3, backoff_factor=0.5, status_forcelist=[429, 502, 503, 504], raise_on_status=False)
+    adapter = HTTPAdapter(pool_connections=16, pool_maxsize=16, max_retries=retry)
+    session.mount("https://", adapter)
+    # Self-hosted GitLab instances may be served over plain HTTP
+    session.mount("http://", adapter)
+    return session
+
+
+DEFAULT_CACHE_DIR = Path.home() / ".cache" / "flaky-detector"
+
+# Size bound of the cached response bodies; the least recently used are
+# removed beyond it
+MAX_CACHED_BODY_BYTES = 256 * 1024 * 1024
+
+# Age after which a leftover temporary body file counts as abandoned
+STALE_TMP_SECONDS = 3600
+
+# Pipeline states after which GitLab job logs no longer change
+GITLAB_FINISHED_STATUSES = {"success", "failed", "canceled", "skipped"}
+
+# Response headers kept with cached bodies, needed to paginate listings
+PAGINATION_HEADERS = ("Link", "X-Total-Pages")
+
+# Remaining-quota and reset-time (epoch seconds) headers, as sent by
+# GitHub and by GitLab
+RATE_LIMIT_HEADERS = (
+    ("X-RateLimit-Remaining", "X-RateLimit-Reset"),
+    ("RateLimit-Remaining", "RateLimit-Reset"),
+)
+
+# New runs analyzed per invocation while the remaining quota is unknown
+DEFAULT_NEW_RUN_LIMIT = 20
+
+# Remaining requests per fetch thread; below this, fetches get serial
+REQUESTS_PER_FETCH_WORKER = 100
+
+
+def _page_count(headers: Dict[str, str]) -> int:
+    """Number of pages of a listing, from the headers of its first page"""
+    # GitLab states the total directly, but omits it for very large sets
+    total_pages = headers.get("X-Total-Pages")
+    if total_pages:
+        return int(total_pages)
+    # GitHub (and GitLab) link to the last page
+    for link in requests.utils.parse_header_links(headers.get("Link", "")):
+        if link.get("rel") == "last":
+            return int(parse_qs(urlsplit(link["url"]).query).get("page", ["1"])[0])
+    return 1
+
+
+class ResponseCache:
+    """Persistent cache of API responses
+
+    Responses are revalidated with If-None-Match, so an unchanged resource
+    costs a 304 without a body instead of a full download.
+    """
+
+    def __init__(self, session: requests.Session, cache_dir: Path = DEFAULT_CACHE_DIR):
+        self.session = session
+        self.body_dir = cache_dir / "bodies"
+        self.body_dir.mkdir(parents=True, exist_ok=True)
+        # Fetches run on a thread pool, so the connection is shared
+        # behind a lock
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(str(cache_dir / "etags.sqlite"), check_same_thread=False)
+        with self._db:
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS responses "
+                "(key TEXT PRIMARY KEY, etag TEXT NOT NULL, headers TEXT NOT NULL)"
+            )
+        self._evict()
+        # API quota as of the latest response, None until a response
+        # reports it
+        self.rate_remaining: Optional[int] = None
+        self.rate_reset: Optional[float] = None
+
+    def _note_rate_limit(self, response: requests.Response):
+        """Record the remaining quota reported by a response"""
+        for remaining_header, reset_header in RATE_LIMIT_HEADERS:
+            remaining = response.headers.get(remaining_header)
+            if remaining is not None:
+                reset = response.headers.get(reset_header)
+                with self._lock:
+                    self.rate_remaining = int(remaining)
+                    self.rate_reset = float(reset) if reset else None
+                return
+
+    def _is_rate_limited(self, response: requests.Response) -> bool:
+        # GitHub answers an exhausted quota with 403 rather than 429
+        return response.status_code == 429 or (
+            response.status_code == 403 and self.rate_remaining == 0
+        )
+
+    def _wait_for_reset(self):
+        """Sleep until the API quota is replenished"""
+        delay = self.rate_reset - time.time() if self.rate_reset else 0
+        if delay > 0:
+            print(f"Rate limit reached, waiting {delay:.0f}s for it to reset...")
+            time.sleep(delay)
+
+    def max_workers(self) -> int:
+        """Number of concurrent fetches the remaining quota allows"""
+        if self.rate_remaining is None:
+            return MAX_CONCURRENT_FETCHES
+        return max(1, min(MAX_CONCURRENT_FETCHES, self.rate_remaining // REQUESTS_PER_FETCH_WORKER))
+
+    def run_limit(self, requests_per_run: int) -> int:
+        """Number of new runs to analyze, spending at most half the remaining quota"""
+        if self.rate_remaining is None:
+            return DEFAULT_NEW_RUN_LIMIT
+        return self.rate_remaining // 2 // requests_per_run
+
+    def _evict(self, max_bytes: int = MAX_CACHED_BODY_BYTES):
+        """Remove the least recently used bodies beyond max_bytes"""
+        now = time.time()
+        bodies = []
+        for path in self.body_dir.iterdir():
+            stat = path.stat()
+            if path.suffix == ".tmp":
+                # Left behind by an interrupted write
+                if now - stat.st_mtime > STALE_TMP_SECONDS:
+                    path.unlink(missing_ok=True)
+            else:
+                bodies.append((stat.st_mtime, stat.st_size, path))
+
+        # A body's mtime is refreshed whenever it is served, so the oldest
+        # are the least recently used
+        bodies.sort(reverse=True)
+        total = 0
+        evicted = []
+        for _, size, path in bodies:
+            total += size
+            if total > max_bytes:
+                path.unlink(missing_ok=True)
+                evicted.append((path.name,))
+        if evicted:
+            with self._lock, self._db:
+                self._db.executemany("DELETE FROM responses WHERE key = ?", evicted)
+
+    @staticmethod
+    def _key(url: str, params: Optional[Dict]) -> str:
+        query = sorted((params or {}).items())
+        return hashlib.sha1(f"{url}?{query}".encode()).hexdigest()
+
+    def fetch(self, url: str, params: Optional[Dict] = None,
+              store: bool = True) -> Tuple[bytes, Dict[str, str]]:
+        """GET url and return the body and pagination headers, from disk if unchanged
+
+        With store=False the response bypasses the cache: it is neither
+        revalidated nor kept, for bodies that will not be requested again.
+        """
+        key = self._key(url, params)
+        body_path = self.body_dir / key
+
+        row = None
+        if store and body_path.exists():
+            with self._lock:
+                row = self._db.execute(
+                    "SELECT etag, headers FROM responses WHERE key = ?", (key,)
+                ).fetchone()
+
+        request_headers = {"If-None-Match": row[0]} if row else {}
+        response = self.session.get(url, headers=request_headers, params=params)
+        self._note_rate_limit(response)
+        if self._is_rate_limited(response):
+            # Retried once, after the quota resets
+            self._wait_for_reset()
+            response = self.session.get(url, headers=request_headers, params=params)
+            self._note_rate_limit(response)
+        if row and response.status_code == 304:
+            os.utime(body_path)
+            return body_path.read_bytes(), json.loads(row[1])
+        response.raise_for_status()
+
+        body = response.content
+        kept_headers = {name: response.headers[name] for name in PAGINATION_HEADERS if name in response.headers}
+        etag = response.headers.get("ETag")
+        if store and etag:
+            # Write under a temporary name so a concurrent reader never
+            # sees a partial body
+            tmp_path = body_path.with_name(f"{key}.{threading.get_ident()}.tmp")
+            tmp_path.write_bytes(body)
+            os.replace(tmp_path, body_path)
+            with self._lock, self._db:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO responses VALUES (?, ?, ?)",
+                    (key, etag, json.dumps(kept_headers))
+                )
+        return body, kept_headers
+
+    def get(self, url: str, params: Optional[Dict] = None, store: bool = True) -> bytes:
+        """GET url and return the body, served from disk if it is unchanged"""
+        return self.fetch(url, params, store)[0]
+
+    def get_pages(self, url: str, params: Dict) -> List[bytes]:
+        """GET every page of a paginated listing and return the bodies in order
+
+        The first page tells how many there are; the others are then
+        fetched concurrently rather than by following next links one by
+        one.
+        """
+        first_page, page_headers = self.fetch(url, params)
+        pages = list(range(2, _page_count(page_headers) + 1))
+        rest = _fetch_concurrently(
+            lambda page: self.get(url, {**params, "page": page}), pages, self.max_workers()
+        )
+        return [first_page, *(rest[page] for page in pages)]
+
+
+@dataclass(slots=True)
 class CITestRun:
     """Single test execution in CI"""
     test_name: str
@@ -27,18 +308,102 @@ class CITestRun:
     duration: float = 0.0
 
 
+if sys.version_info >= (3, 11):
+    _parse_timestamp = datetime.fromisoformat
+else:
+    def _parse_timestamp(created_at: str) -> datetime:
+        # fromisoformat only accepts a "Z" suffix since Python 3.11
+        return datetime.fromisoformat(created_at.replace('Z', '+00:00'))
+
+
+@dataclass(slots=True)
+class CIRunInfo:
+    """Metadata of one CI run, shared by every test it executed"""
+    run_id: str
+    run_number: int
+    commit_sha: str
+    branch: str
+    created_at: str  # ISO 8601, as returned by the API
+
+    @property
+    def timestamp(self) -> datetime:
+        """Start of the run, parsed only when an execution is displayed"""
+        return _parse_timestamp(self.created_at)
+
+
+# Outcome codes stored per run in CIFlakyTest.outcomes
+OUTCOME_PASSED, OUTCOME_FAILED, OUTCOME_ERROR, OUTCOME_SKIPPED = range(4)
+
+_OUTCOME_CODES = {
+    'passed': OUTCOME_PASSED,
+    'failed': OUTCOME_FAILED,
+    'error': OUTCOME_ERROR,
+    'skipped': OUTCOME_SKIPPED,
+}
+_OUTCOME_STATUSES = tuple(_OUTCOME_CODES)
+
+
 @dataclass
 class CIFlakyTest:
-    """Test detected as flaky from CI history"""
+    """Test detected as flaky from CI history
+
+    Results are stored column-wise: one outcome byte per run, plus a
+    parallel list of references to the shared CIRunInfo of each run,
+    instead of a CITestRun object per execution.
+    """
     test_name: str
-    total_runs: int
-    pass_count: int = 0
-    fail_count: int = 0
-    skip_count: int = 0
-    runs: List[CITestRun] = field(default_factory=list)
+    outcomes: bytearray = field(default_factory=bytearray)
+    run_infos: List[CIRunInfo] = field(default_factory=list)
     branches: set = field(default_factory=set)
 
+    def add_run(self, status: str, run_info: CIRunInfo):
+        """Record the outcome of this test in one CI run"""
+        self.outcomes.append(_OUTCOME_CODES[status])
+        self.run_infos.append(run_info)
+
+    @property
+    def total_runs(self) -> int:
+        return len(self.outcomes)
+
+    @property
+    def pass_count(self) -> int:
+        return self.outcomes.count(OUTCOME_PASSED)
+
     @property
+    def fail_count(self) -> int:
+        # Errors count as failures
+        return self.outcomes.count(OUTCOME_FAILED) + self.outcomes.count(OUTCOME_ERROR)
+
+    @property
+    def skip_count(self) -> int:
+        return self.outcomes.count(OUTCOME_SKIPPED)
+
+    @property
+    def runs(self) -> List[CITestRun]:
+        """Individual executions, built on demand from the stored columns"""
+        return self.recent_runs(self.total_runs)
+
+    def recent_runs(self, n: int) -> List[CITestRun]:
+        """The first n executions, most recent first as the API lists runs
+
+        Only these are built, and only their timestamps parsed.
+        """
+        return [
+            CITestRun(
+                test_name=self.test_name,
+                status=_OUTCOME_STATUSES[code],
+                run_id=info.run_id,
+                run_number=info.run_number,
+                commit_sha=info.commit_sha,
+                branch=info.branch,
+                timestamp=info.timestamp
+            )
+            for code, info in zip(self.outcomes[:n], self.run_infos[:n])
+        ]
+
+    # Cached: get_flaky_tests sorts by it, and the history is complete
+    # by the time anything reads it
+    @cached_property
     def flakiness_score(self) -> float:
         """Calculate flakiness score based on CI history"""
         if self.total_runs == 0:
@@ -60,15 +425,102 @@ class CIFlakyTest:
         return self.fail_count / self.total_runs
 
 
+_HISTORY_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    source TEXT NOT NULL,
+    run_id TEXT NOT NULL,
+    run_number INTEGER NOT NULL,
+    commit_sha TEXT NOT NULL,
+    branch TEXT NOT NULL,
+    created_at TEXT NOT NULL,
+    PRIMARY KEY (source, run_id)
+);
+CREATE TABLE IF NOT EXISTS results (
+    source TEXT NOT NULL,
+    run_id TEXT NOT NULL,
+    test_name TEXT NOT NULL,
+    status TEXT NOT NULL,
+    FOREIGN KEY (source, run_id) REFERENCES runs (source, run_id)
+);
+CREATE INDEX IF NOT EXISTS results_by_run ON results (source, run_id);
+"""
+
+
+class HistoryStore:
+    """Local SQLite history of test results from finished CI runs
+
+    Logs of a finished run never change, so each run is downloaded and
+    parsed once; later analyses read its results from here. Runs are
+    grouped by source, e.g. "github:owner/repo".
+    """
+
+    def __init__(self, cache_dir: Path = DEFAULT_CACHE_DIR):
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(str(cache_dir / "history.sqlite"))
+        with self._db:
+            self._db.executescript(_HISTORY_SCHEMA)
+
+    def stored_run_ids(self, source: str) -> Set[str]:
+        """IDs of all runs of source already in the history"""
+        rows = self._db.execute("SELECT run_id FROM runs WHERE source = ?", (source,))
+        return {run_id for run_id, in rows}
+
+    def add_run(self, source: str, run_info: CIRunInfo, results: List[Tuple[str, str]]):
+        """Store the (test_name, status) results of a finished run"""
+        with self._db:
+            inserted = self._db.execute(
+                "INSERT OR IGNORE INTO runs VALUES (?, ?, ?, ?, ?, ?)",
+                (source, run_info.run_id, run_info.run_number, run_info.commit_sha,
+                 run_info.branch, run_info.created_at)
+            ).rowcount
+            if inserted:
+                self._db.executemany(
+                    "INSERT INTO results VALUES (?, ?, ?, ?)",
+                    [(source, run_info.run_id, test_name, status) for test_name, status in results]
+                )
+
+    def load_results(self, source: str, run_ids: List[str]) -> Dict[str, List[Tuple[str, str]]]:
+        """Stored (test_name, status) results of the given runs, in parse order"""
+        results: Dict[str, List[Tuple[str, str]]] = {}
+        # Chunked to stay below SQLite's limit on bound parameters
+        for start in range(0, len(run_ids), 500):
+            chunk = run_ids[start:start + 500]
+            rows = self._db.execute(
+                "SELECT run_id, test_name, status FROM results "
+                f"WHERE source = ? AND run_id IN ({', '.join('?' * len(chunk))}) ORDER BY rowid",
+                (source, *chunk)
+            )
+            for run_id, test_name, status in rows:
+                results.setdefault(run_id, []).append((sys.intern(test_name), status))
+        return results
+
+
+def _aggregate(runs: Iterable[Tuple[CIRunInfo, List[Tuple[str, str]]]]) -> Dict[str, CIFlakyTest]:
+    """Build per-test histories from each run's (test_name, status) results"""
+    test_results: Dict[str, CIFlakyTest] = {}
+    for run_info, results in runs:
+        for test_name, status in results:
+            # One probe for tests seen before; no throwaway object as
+            # setdefault would build for every execution
+            test_result = test_results.get(test_name)
+            if test_result is None:
+                test_result = test_results[test_name] = CIFlakyTest(test_name=test_name)
+            test_result.branches.add(run_info.branch)
+            test_result.add_run(status, run_info)
+    return test_results
+
+
 class GitHubActionsAnalyzer:
     """Analyze test history from GitHub Actions"""
 
-    def __init__(self, repo: str, token: str, workflow_name: str = "tests"):
+    def __init__(self, repo: str, token: str, workflow_name: str = "tests",
+                 cache_dir: Path = DEFAULT_CACHE_DIR):
         """
         Args:
             repo: Repository in format "owner/repo"
             token: GitHub personal access token
             workflow_name: Name of workflow file (without .yml)
+            cache_dir: Directory for cached API responses and run history
         """
         self.repo = repo
         self.token = token
@@ -78,10 +530,15 @@ class GitHubActionsAnalyzer:
             "Authorization": f"Bearer {token}",
             "Accept": "application/vnd.github.v3+json"
         }
+        self.session = _make_session(self.headers)
+        self.cache = ResponseCache(self.session, cache_dir)
+        self.history = HistoryStore(cache_dir)
 
     def fetch_workflow_runs(self, days: int = 30, branch: str = "main") -> List[Dict]:
         """Fetch workflow runs from last N days"""
-        since = (datetime.now() - timedelta(days=days)).isoformat()
+        # A date rather than the current time, so the listing's cache
+        # key, and with it its ETag, stays the same from run to run
+        since = (date.today() - timedelta(days=days)).isoformat()
 
         url = f"{self.base_url}/repos/{self.repo}/actions/runs"
         params = {
@@ -91,9 +548,11 @@ class GitHubActionsAnalyzer:
         }
 
         try:
-            response = requests.get(url, headers=self.headers, params=params)
-            response.raise_for_status()
-            all_runs = response.json().get("workflow_runs", [])
+            all_runs = [
+                run
+                for page in self.cache.get_pages(url, params)
+                for run in json.loads(page).get("workflow_runs", [])
+            ]
 
             # Filter by workflow name if specified
             if self.workflow_name:
@@ -109,141 +568,115 @@ class GitHubActionsAnalyzer:
             print(f"Error fetching workflow runs: {e}")
             return []
 
-    def fetch_job_logs(self, run_id: int) -> Optional[str]:
-        """Fetch logs for a specific workflow run"""
+    def fetch_job_logs(self, run_id: int, cache: bool = True) -> Optional[bytes]:
+        """Fetch the log archive of a specific workflow run"""
         url = f"{self.base_url}/repos/{self.repo}/actions/runs/{run_id}/logs"
 
         try:
-            response = requests.get(url, headers=self.headers)
-            response.raise_for_status()
-
-            # GitHub Actions logs are returned as a ZIP file
-            # Extract all log files and concatenate them
-            all_logs = []
-            with zipfile.ZipFile(io.BytesIO(response.content)) as zip_file:
-                for file_name in zip_file.namelist():
-                    with zip_file.open(file_name) as log_file:
-                        all_logs.append(log_file.read().decode('utf-8', errors='ignore'))
-
-            return '\n'.join(all_logs)
+            return self.cache.get(url, store=cache)
         except requests.RequestException as e:
             print(f"Error fetching logs for run {run_id}: {e}")
             return None
+
+    def parse_log_archive(self, run_id: int, archive: bytes) -> Optional[List[Dict]]:
+        """Parse pytest output from every log file in a run's log archive"""
+        # GitHub Actions logs are returned as a ZIP file. Entries are
+        # parsed one at a time, as raw bytes, so only a single log file is
+        # ever held in memory
+        tests = []
+        try:
+            with zipfile.ZipFile(io.BytesIO(archive)) as zip_file:
+                for file_name in zip_file.namelist():
+                    if not file_name.endswith('.txt'):
+                        continue
+                    with zip_file.open(file_name) as log_file:
+                        tests.extend(self.parse_pytest_output(log_file.read()))
         except zipfile.BadZipFile as e:
             print(f"Error extracting logs for run {run_id}: {e}")
             return None
+        return tests
 
-    def parse_pytest_output(self, logs: str) -> List[Dict]:
+    def parse_pytest_output(self, logs: bytes) -> List[Dict]:
         """Parse pytest output from CI logs"""
-        import re
-        tests = []
-
-        # Look for pytest output patterns
-        lines = logs.split('\n')
-
-        for i, line in enumerate(lines):
-            # Strip ANSI color codes that GitHub Actions might include
-            clean_line = re.sub(r'\x1b\[[0-9;]*m', '', line)
-
-            # Match pytest test results with optional timestamp prefix
-            # Format: "[timestamp] test_file.py::test_name PASSED [percentage]"
-            if '::' in clean_line and any(status in clean_line for status in ['PASSED', 'FAILED', 'SKIPPED', 'ERROR']):
-                parts = clean_line.split()
-
-                # Find the test_id (contains ::) and status
-                test_id = None
-                status = None
-
-                for j, part in enumerate(parts):
-                    if '::' in part:
-                        test_id = part
-                        # Status is typically the next non-bracket item
-                        if j + 1 < len(parts):
-                            potential_status = parts[j + 1].upper()
-                            if potential_status in ['PASSED', 'FAILED', 'SKIPPED', 'ERROR']:
-                                status = potential_status.lower()
-                        break
-
-                if test_id and status and '::' in test_id:
-                    test_name = test_id.split('::')[-1]
-                    tests.append({
-                        'test_name': test_name,
-                        'test_id': test_id,
-                        'status': status
-                    })
-
-        return tests
+        return parse_pytest_output(logs)
+
+    def fetch_run_results(self, run: Dict) -> Optional[List[Tuple[str, str]]]:
+        """Fetch and parse the logs of a run, returning its (test_name, status) results"""
+        # Completed runs go to the history and are never fetched again, so
+        # their archives are not worth caching
+        archive = self.fetch_job_logs(run['id'], cache=run.get('status') != 'completed')
+        tests = self.parse_log_archive(run['id'], archive) if archive else None
+        if tests is None:
+            return None
+        return [(test_data['test_name'], test_data['status']) for test_data in tests]
+
+    @staticmethod
+    def _run_info(run: Dict) -> CIRunInfo:
+        return CIRunInfo(
+            run_id=str(run['id']),
+            run_number=run['run_number'],
+            commit_sha=sys.intern(run['head_sha']),
+            branch=sys.intern(run['head_branch']),
+            created_at=run['created_at']
+        )
 
     def analyze(self, days: int = 30, branch: str = "main") -> Dict[str, CIFlakyTest]:
         """Analyze CI history for flaky tests"""
         print(f"Fetching GitHub Actions runs for {self.repo} (last {days} days)...")
 
         workflow_runs = self.fetch_workflow_runs(days, branch)
-        test_results = defaultdict(lambda: CIFlakyTest(test_name="", total_runs=0))
-
-        print(f"Found {len(workflow_runs)} workflow runs")
-
-        for i, run in enumerate(workflow_runs[:20], 1):  # Limit to 20 runs for API quota
+        source = f"github:{self.repo}"
+        stored = self.history.stored_run_ids(source)
+        stored_in_window = [str(run['id']) for run in workflow_runs if str(run['id']) in stored]
+
+        print(f"Found {len(workflow_runs)} workflow runs ({len(stored_in_window)} already analyzed)")
+
+        # Stored runs cost no API requests, so the limit only applies to
+        # runs not seen before. Each new run costs one request, its logs
+        new_runs = [run for run in workflow_runs if str(run['id']) not in stored]
+        new_runs = new_runs[:self.cache.run_limit(requests_per_run=1)]
+
+        # Each fetch thread parses the archive it downloaded and keeps only
+        # the results, so at most one archive per thread is in memory.
+        # Progress output stays sequential and in run order
+        new_results = _fetch_concurrently(
+            self.fetch_run_results, new_runs, self.cache.max_workers(), key=lambda run: run['id']
+        )
+
+        results_by_run = self.history.load_results(source, stored_in_window)
+        for i, run in enumerate(new_runs, 1):
             run_id = run['id']
-            run_number = run['run_number']
-            commit_sha = run['head_sha']
-            run_branch = run['head_branch']
-            timestamp = datetime.fromisoformat(run['created_at'].replace('Z', '+00:00'))
+            print(f"  Analyzing run {i}/{len(new_runs)} (#{run['run_number']})...", end=" ", flush=True)
 
-            print(f"  Analyzing run {i}/20 (#{run_number})...", end=" ", flush=True)
-
-            logs = self.fetch_job_logs(run_id)
-            if not logs:
+            results = new_results[run_id]
+            if results is None:
                 print("❌ No logs")
                 continue
+            print(f"✓ {len(results)} tests")
 
-            tests = self.parse_pytest_output(logs)
-            print(f"✓ {len(tests)} tests")
-
-            for test_data in tests:
-                test_name = test_data['test_name']
-                status = test_data['status']
-
-                if test_name not in test_results:
-                    test_results[test_name] = CIFlakyTest(
-                        test_name=test_name,
-                        total_runs=0
-                    )
-
-                test_result = test_results[test_name]
-                test_result.total_runs += 1
-                test_result.branches.add(run_branch)
-
-                ci_run = CITestRun(
-                    test_name=test_name,
-                    status=status,
-                    run_id=str(run_id),
-                    run_number=run_number,
-                    commit_sha=commit_sha,
-                    branch=run_branch,
-                    timestamp=timestamp
-                )
-                test_result.runs.append(ci_run)
+            results_by_run[str(run_id)] = results
+            # Logs of runs still in progress may change, so those are
+            # fetched again next time
+            if run.get('status') == 'completed':
+                self.history.add_run(source, self._run_info(run), results)
 
-                if status == 'passed':
-                    test_result.pass_count += 1
-                elif status in ['failed', 'error']:
-                    test_result.fail_count += 1
-                elif status == 'skipped':
-                    test_result.skip_count += 1
-
-        return dict(test_results)
+        return _aggregate(
+            (self._run_info(run), results_by_run[str(run['id'])])
+            for run in workflow_runs if str(run['id']) in results_by_run
+        )
 
 
 class GitLabCIAnalyzer:
     """Analyze test history from GitLab CI"""
 
-    def __init__(self, project_id: str, token: str, gitlab_url: str = "https://gitlab.com"):
+    def __init__(self, project_id: str, token: str, gitlab_url: str = "https://gitlab.com",
+                 cache_dir: Path = DEFAULT_CACHE_DIR):
         """
         Args:
             project_id: GitLab project ID or "namespace/project"
             token: GitLab personal access token
             gitlab_url: GitLab instance URL
+            cache_dir: Directory for cached API responses and run history
         """
         self.project_id = project_id
         self.token = token
@@ -251,10 +684,15 @@ class GitLabCIAnalyzer:
         self.headers = {
             "PRIVATE-TOKEN": token
         }
+        self.session = _make_session(self.headers)
+        self.cache = ResponseCache(self.session, cache_dir)
+        self.history = HistoryStore(cache_dir)
 
     def fetch_pipelines(self, days: int = 30, ref: str = "main") -> List[Dict]:
         """Fetch pipelines from last N days"""
-        since = (datetime.now() - timedelta(days=days)).isoformat()
+        # A date rather than the current time, so the listing's cache
+        # key, and with it its ETag, stays the same from run to run
+        since = (date.today() - timedelta(days=days)).isoformat()
 
         url = f"{self.base_url}/projects/{self.project_id}/pipelines"
         params = {
@@ -264,21 +702,21 @@ class GitLabCIAnalyzer:
         }
 
         try:
-            response = requests.get(url, headers=self.headers, params=params)
-            response.raise_for_status()
-            return response.json()
+            return [
+                pipeline
+                for page in self.cache.get_pages(url, params)
+                for pipeline in json.loads(page)
+            ]
         except requests.RequestException as e:
             print(f"Error fetching pipelines: {e}")
             return []
 
-    def fetch_job_log(self, job_id: int) -> Optional[str]:
+    def fetch_job_log(self, job_id: int, cache: bool = True) -> Optional[bytes]:
         """Fetch logs for a specific job"""
         url = f"{self.base_url}/projects/{self.project_id}/jobs/{job_id}/trace"
 
         try:
-            response = requests.get(url, headers=self.headers)
-            response.raise_for_status()
-            return response.text
+            return self.cache.get(url, store=cache)
         except requests.RequestException as e:
             print(f"Error fetching job log {job_id}: {e}")
             return None
@@ -288,100 +726,93 @@ class GitLabCIAnalyzer:
         url = f"{self.base_url}/projects/{self.project_id}/pipelines/{pipeline_id}/jobs"
 
         try:
-            response = requests.get(url, headers=self.headers)
-            response.raise_for_status()
-            return response.json()
+            return json.loads(self.cache.get(url))
         except requests.RequestException as e:
             print(f"Error fetching jobs for pipeline {pipeline_id}: {e}")
             return []
 
-    def parse_pytest_output(self, logs: str) -> List[Dict]:
+    def parse_pytest_output(self, logs: bytes) -> List[Dict]:
         """Parse pytest output from CI logs"""
-        tests = []
-
-        lines = logs.split('\n')
-        for line in lines:
-            if '::' in line and any(status in line for status in ['PASSED', 'FAILED', 'SKIPPED', 'ERROR']):
-                parts = line.split()
-                if len(parts) >= 2:
-                    test_id = parts[0]
-                    status = parts[1].lower()
-
-                    if '::' in test_id:
-                        test_name = test_id.split('::')[-1]
-                        tests.append({
-                            'test_name': test_name,
-                            'test_id': test_id,
-                            'status': status
-                        })
-
-        return tests
+        return parse_pytest_output(logs)
+
+    def fetch_job_results(self, job_id: int, finished: bool) -> Optional[List[Tuple[str, str]]]:
+        """Fetch and parse the log of a test job, returning its (test_name, status) results"""
+        # Jobs of finished pipelines go to the history and are never
+        # fetched again, so their logs are not worth caching
+        logs = self.fetch_job_log(job_id, cache=not finished)
+        if not logs:
+            return None
+        return [(test_data['test_name'], test_data['status']) for test_data in self.parse_pytest_output(logs)]
+
+    @staticmethod
+    def _run_info(pipeline: Dict) -> CIRunInfo:
+        return CIRunInfo(
+            run_id=str(pipeline['id']),
+            run_number=pipeline['id'],
+            commit_sha=sys.intern(pipeline['sha']),
+            branch=sys.intern(pipeline['ref']),
+            created_at=pipeline['created_at']
+        )
 
     def analyze(self, days: int = 30, ref: str = "main") -> Dict[str, CIFlakyTest]:
         """Analyze CI history for flaky tests"""
         print(f"Fetching GitLab CI pipelines (last {days} days)...")
 
         pipelines = self.fetch_pipelines(days, ref)
-        test_results = defaultdict(lambda: CIFlakyTest(test_name="", total_runs=0))
-
-        print(f"Found {len(pipelines)} pipelines")
-
-        for i, pipeline in enumerate(pipelines[:20], 1):  # Limit to 20 for API quota
+        source = f"gitlab:{self.base_url}:{self.project_id}"
+        stored = self.history.stored_run_ids(source)
+        stored_in_window = [str(p['id']) for p in pipelines if str(p['id']) in stored]
+
+        print(f"Found {len(pipelines)} pipelines ({len(stored_in_window)} already analyzed)")
+
+        # Limit pipelines not seen before to what the API quota allows.
+        # Each costs two requests, its job list and its test job's log
+        new_pipelines = [p for p in pipelines if str(p['id']) not in stored]
+        new_pipelines = new_pipelines[:self.cache.run_limit(requests_per_run=2)]
+
+        # Two concurrent waves: the job lists of all new pipelines, then
+        # the logs of each pipeline's test job. Logs are parsed on the fetch
+        # threads, which keep only the results
+        jobs_by_pipeline = _fetch_concurrently(
+            self.fetch_pipeline_jobs, [p['id'] for p in new_pipelines], self.cache.max_workers()
+        )
+        test_jobs = {
+            pipeline_id: next((j for j in jobs if 'test' in j['name'].lower()), None)
+            for pipeline_id, jobs in jobs_by_pipeline.items()
+        }
+        results_by_pipeline = _fetch_concurrently(
+            lambda pipeline: self.fetch_job_results(
+                test_jobs[pipeline['id']]['id'], pipeline.get('status') in GITLAB_FINISHED_STATUSES
+            ),
+            [p for p in new_pipelines if test_jobs[p['id']]],
+            self.cache.max_workers(),
+            key=lambda pipeline: pipeline['id']
+        )
+
+        results_by_run = self.history.load_results(source, stored_in_window)
+        for i, pipeline in enumerate(new_pipelines, 1):
             pipeline_id = pipeline['id']
-            commit_sha = pipeline['sha']
-            pipeline_ref = pipeline['ref']
-            timestamp = datetime.fromisoformat(pipeline['created_at'].replace('Z', '+00:00'))
-
-            print(f"  Analyzing pipeline {i}/20 (#{pipeline_id})...", end=" ", flush=True)
-
-            jobs = self.fetch_pipeline_jobs(pipeline_id)
-            test_job = next((j for j in jobs if 'test' in j['name'].lower()), None)
+            print(f"  Analyzing pipeline {i}/{len(new_pipelines)} (#{pipeline_id})...", end=" ", flush=True)
 
+            test_job = test_jobs[pipeline_id]
             if not test_job:
                 print("❌ No test job")
                 continue
 
-            logs = self.fetch_job_log(test_job['id'])
-            if not logs:
+            results = results_by_pipeline[pipeline_id]
+            if results is None:
                 print("❌ No logs")
                 continue
+            print(f"✓ {len(results)} tests")
 
-            tests = self.parse_pytest_output(logs)
-            print(f"✓ {len(tests)} tests")
-
-            for test_data in tests:
-                test_name = test_data['test_name']
-                status = test_data['status']
-
-                if test_name not in test_results:
-                    test_results[test_name] = CIFlakyTest(
-                        test_name=test_name,
-                        total_runs=0
-                    )
-
-                test_result = test_results[test_name]
-                test_result.total_runs += 1
-                test_result.branches.add(pipeline_ref)
-
-                ci_run = CITestRun(
-                    test_name=test_name,
-                    status=status,
-                    run_id=str(pipeline_id),
-                    run_number=pipeline_id,
-                    commit_sha=commit_sha,
-                    branch=pipeline_ref,
-                    timestamp=timestamp
-                )
-                test_result.runs.append(ci_run)
-
-                if status == 'passed':
-                    test_result.pass_count += 1
-                elif status in ['failed', 'error']:
-                    test_result.fail_count += 1
-                elif status == 'skipped':
-                    test_result.skip_count += 1
+            results_by_run[str(pipeline_id)] = results
+            if pipeline.get('status') in GITLAB_FINISHED_STATUSES:
+                self.history.add_run(source, self._run_info(pipeline), results)
 
-        return dict(test_results)
+        return _aggregate(
+            (self._run_info(pipeline), results_by_run[str(pipeline['id'])])
+            for pipeline in pipelines if str(pipeline['id']) in results_by_run
+        )
 
 
 def get_flaky_tests(test_results: Dict[str, CIFlakyTest], min_runs: int = 3) -> List[CIFlakyTest]:
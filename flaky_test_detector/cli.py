@@ -4,14 +4,15 @@ CLI interface for flaky test detector
 
 import typer
 from pathlib import Path
+from typing import Dict, List, Optional
 from rich.console import Console
 from rich.table import Table
 from rich.panel import Panel
 from rich.markdown import Markdown
 from rich import box
 
-from .detector import FlakyDetector
-from .analyzer import RootCauseAnalyzer
+from .detector import OUTCOME_FAILED, OUTCOME_PASSED, FlakyDetector
+from .analyzer import RootCause, RootCauseAnalyzer
 from .suggester import RepairSuggester
 
 
@@ -21,6 +22,20 @@ app = typer.Typer(
 )
 console = Console()
 
+# Sequence symbol per outcome code; errors and skips share the neutral one
+OUTCOME_SYMBOLS = {
+    OUTCOME_PASSED: '[green]✓[/green]',
+    OUTCOME_FAILED: '[red]✗[/red]',
+}
+OTHER_OUTCOME_SYMBOL = '[yellow]⊘[/yellow]'
+
+
+def _validate_workers(value: Optional[str]) -> Optional[str]:
+    """Accept the worker counts pytest-xdist's -n does"""
+    if value is None or value in ("auto", "logical") or (value.isdigit() and int(value) > 0):
+        return value
+    raise typer.BadParameter("must be 'auto', 'logical' or a positive number")
+
 
 @app.command()
 def detect(
@@ -29,6 +44,9 @@ def detect(
     verbose: bool = typer.Option(False, "--verbose", "-v", help="Show detailed output"),
     analyze: bool = typer.Option(True, "--analyze/--no-analyze", help="Analyze root causes"),
     suggest: bool = typer.Option(True, "--suggest/--no-suggest", help="Suggest repairs"),
+    fused: bool = typer.Option(False, "--fused", help="Run all repetitions in one pytest session"),
+    workers: Optional[str] = typer.Option(None, "--workers", "-w", callback=_validate_workers,
+                                          help="pytest-xdist workers ('auto' or a number)"),
 ):
     """
     Detect flaky tests by running them multiple times and analyzing inconsistent results.
@@ -40,13 +58,12 @@ def detect(
     ))
 
     # Run detection
-    detector = FlakyDetector(test_path, runs=runs, verbose=verbose)
-
-    try:
-        detector.run_detection()
-    except Exception as e:
-        console.print(f"[bold red]Error:[/bold red] {e}")
-        raise typer.Exit(1)
+    with FlakyDetector(test_path, runs=runs, verbose=verbose, fused=fused, workers=workers) as detector:
+        try:
+            detector.run_detection()
+        except Exception as e:
+            console.print(f"[bold red]Error:[/bold red] {e}")
+            raise typer.Exit(1)
 
     # Get results
     # Use the working directory pytest used (stored in detector)
@@ -79,6 +96,22 @@ def detect(
 
     console.print(f"\n[bold red]⚠ {len(flaky_tests)} Flaky Test(s) Detected[/bold red]")
 
+    # Root causes per test ID, shared by the per-test and the detailed
+    # sections; empty when the test file cannot be found
+    causes_by_test: Dict[str, List[RootCause]] = {}
+
+    def causes_for(test) -> List[RootCause]:
+        if test.test_id not in causes_by_test:
+            # Resolve test file path relative to pytest's cwd
+            test_file_path = pytest_cwd / test.test_file
+            causes_by_test[test.test_id] = (
+                RootCauseAnalyzer(test_file_path).analyze(test.test_function)
+                if test_file_path.exists() else []
+            )
+        return causes_by_test[test.test_id]
+
+    suggester = RepairSuggester()
+
     for i, test in enumerate(flaky_tests, 1):
         # Test details
         console.print(f"\n[bold yellow]{i}. {test.test_function}[/bold yellow]")
@@ -94,14 +127,7 @@ def detect(
         )
 
         # Show outcome pattern
-        outcome_symbols = []
-        for outcome in test.outcomes[:20]:
-            if outcome == 'passed':
-                outcome_symbols.append('[green]✓[/green]')
-            elif outcome == 'failed':
-                outcome_symbols.append('[red]✗[/red]')
-            else:
-                outcome_symbols.append('[yellow]⊘[/yellow]')
+        outcome_symbols = [OUTCOME_SYMBOLS.get(outcome, OTHER_OUTCOME_SYMBOL) for outcome in test.outcomes[:20]]
 
         if len(test.outcomes) > 20:
             outcome_symbols.append('...')
@@ -111,35 +137,29 @@ def detect(
 
         # Analyze root causes
         if analyze:
-            # Resolve test file path relative to pytest's cwd
-            test_file_path = pytest_cwd / test.test_file
-
-            if test_file_path.exists():
-                analyzer = RootCauseAnalyzer(test_file_path)
-                causes = analyzer.analyze(test.test_function)
-
-                if causes:
-                    console.print("   [bold cyan]Root Causes:[/bold cyan]")
-                    for cause in causes:
-                        confidence_color = "green" if cause.confidence > 0.8 else "yellow" if cause.confidence > 0.5 else "red"
-                        console.print(f"   • [{confidence_color}]{cause.type.value}[/{confidence_color}] "
-                                      f"(confidence: {cause.confidence:.0%})")
-                        console.print(f"     {cause.description}")
-
-                        if cause.line_numbers:
-                            console.print(f"     [dim]Lines: {', '.join(map(str, cause.line_numbers))}[/dim]")
-
-                        # Show suggestions
-                        if suggest:
-                            suggester = RepairSuggester()
-                            suggestions = suggester.suggest_repairs([cause])
-
-                            if suggestions:
-                                console.print("     [bold green]Suggested Fixes:[/bold green]")
-                                for j, suggestion in enumerate(suggestions[:2], 1):  # Show top 2
-                                    console.print(f"     {j}. {suggestion.title}")
-                                    if verbose:
-                                        console.print(f"        {suggestion.description}")
+            causes = causes_for(test)
+
+            if causes:
+                console.print("   [bold cyan]Root Causes:[/bold cyan]")
+                for cause in causes:
+                    confidence_color = "green" if cause.confidence > 0.8 else "yellow" if cause.confidence > 0.5 else "red"
+                    console.print(f"   • [{confidence_color}]{cause.type.value}[/{confidence_color}] "
+                                  f"(confidence: {cause.confidence:.0%})")
+                    console.print(f"     {cause.description}")
+
+                    if cause.line_numbers:
+                        console.print(f"     [dim]Lines: {', '.join(map(str, cause.line_numbers))}[/dim]")
+
+                    # Show suggestions
+                    if suggest:
+                        suggestions = suggester.suggest_repairs([cause])
+
+                        if suggestions:
+                            console.print("     [bold green]Suggested Fixes:[/bold green]")
+                            for j, suggestion in enumerate(suggestions[:2], 1):  # Show top 2
+                                console.print(f"     {j}. {suggestion.title}")
+                                if verbose:
+                                    console.print(f"        {suggestion.description}")
 
     # Detailed suggestions section
     if suggest and flaky_tests:
@@ -147,20 +167,12 @@ def detect(
         console.print("[bold cyan]Detailed Repair Suggestions[/bold cyan]\n")
 
         for i, test in enumerate(flaky_tests, 1):
-            # Resolve test file path relative to pytest's cwd
-            test_file_path = pytest_cwd / test.test_file
-            if not test_file_path.exists():
-                continue
-
-            analyzer = RootCauseAnalyzer(test_file_path)
-            causes = analyzer.analyze(test.test_function)
-
+            causes = causes_for(test)
             if not causes:
                 continue
 
             console.print(f"[bold yellow]{test.test_function}[/bold yellow]")
 
-            suggester = RepairSuggester()
             all_suggestions = suggester.suggest_repairs(causes)
 
             for j, suggestion in enumerate(all_suggestions, 1):
@@ -239,7 +251,7 @@ def ci_github(
             console.print(results_table)
 
             # Show recent runs
-            recent = test.runs[:5]
+            recent = test.recent_runs(5)
             if recent:
                 console.print("   Recent runs:")
                 for run in recent:
@@ -314,7 +326,7 @@ def ci_gitlab(
             console.print(results_table)
 
             # Show recent runs
-            recent = test.runs[:5]
+            recent = test.recent_runs(5)
             if recent:
                 console.print("   Recent runs:")
                 for run in recent:
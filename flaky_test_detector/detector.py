@@ -2,16 +2,48 @@
 Core flaky test detection engine
 """
 
+import contextlib
+import importlib.util
+import io
 import subprocess
+import sys
 import json
 import tempfile
 from pathlib import Path
-from typing import Dict, List
+from typing import Dict, List, Optional
 from dataclasses import dataclass, field
 from collections import Counter
+from functools import cached_property
 
+import pytest
 
-@dataclass
+from ._repeat_step import BASE_NODEID, REPEAT_STEP
+
+
+# pytest exit codes of runs that stopped before running the tests, e.g. on
+# a bad option or a collection error; their results would read as "stable"
+_ABORTED_EXIT_CODES = {
+    pytest.ExitCode.INTERRUPTED,
+    pytest.ExitCode.INTERNAL_ERROR,
+    pytest.ExitCode.USAGE_ERROR,
+}
+
+
+def _check_exit_code(exit_code: int, output: str) -> None:
+    """Raise if pytest aborted, quoting the error it reported"""
+    if exit_code in _ABORTED_EXIT_CODES:
+        lines = output.strip().splitlines()
+        # Usage errors are followed by the rootdir and inifile, and
+        # collection errors by the summary, so the error line is looked for
+        errors = [
+            line.strip() for line in lines
+            if line.startswith("ERROR") or "error:" in line
+        ] or lines
+        detail = f": {errors[-1]}" if errors else ""
+        raise RuntimeError(f"pytest aborted ({pytest.ExitCode(exit_code).name}){detail}")
+
+
+@dataclass(slots=True)
 class TestResult:
     """Single test execution result"""
     test_id: str
@@ -20,6 +52,18 @@ class TestResult:
     error_message: str = ""
 
 
+# Outcome codes stored per run in FlakyTest.outcomes, one byte each;
+# xfailed and xpassed share OUTCOME_OTHER
+OUTCOME_PASSED, OUTCOME_FAILED, OUTCOME_ERROR, OUTCOME_SKIPPED, OUTCOME_OTHER = b"PFESO"
+
+_OUTCOME_CODES = {
+    'passed': OUTCOME_PASSED,
+    'failed': OUTCOME_FAILED,
+    'error': OUTCOME_ERROR,
+    'skipped': OUTCOME_SKIPPED,
+}
+
+
 @dataclass
 class FlakyTest:
     """Detected flaky test with execution history"""
@@ -30,14 +74,15 @@ class FlakyTest:
     fail_count: int = 0
     error_count: int = 0
     skip_count: int = 0
-    outcomes: List[str] = field(default_factory=list)
+    outcomes: bytearray = field(default_factory=bytearray)
     error_messages: List[str] = field(default_factory=list)
 
-    @property
+    @cached_property
     def flakiness_score(self) -> float:
         """
         Calculate flakiness score (0-1, higher = more flaky)
         Based on outcome entropy - maximum when results are evenly split
+        Computed once, after detection has finished
         """
         total = len(self.outcomes)
         if total == 0:
@@ -53,52 +98,141 @@ class FlakyTest:
     @property
     def is_flaky(self) -> bool:
         """Test is flaky if it has inconsistent outcomes"""
-        unique_outcomes = set(self.outcomes)
         # Flaky if we have both passed and (failed or error)
-        has_pass = 'passed' in unique_outcomes
-        has_fail = 'failed' in unique_outcomes or 'error' in unique_outcomes
-        return has_pass and has_fail
+        return self.pass_count > 0 and (self.fail_count + self.error_count) > 0
 
-    @property
+    @cached_property
     def failure_pattern(self) -> str:
-        """Describe the failure pattern"""
+        """Describe the failure pattern, once detection has finished"""
         if not self.is_flaky:
             return "stable"
 
-        # Check for patterns
-        outcomes_str = ''.join('P' if o == 'passed' else 'F' for o in self.outcomes)
+        # Derived from the counts kept during detection instead of
+        # rebuilding the P/F sequence; anything but a pass counts as F
+        first_passed = self.outcomes[0] == OUTCOME_PASSED
+        non_pass_count = len(self.outcomes) - self.pass_count
 
-        if outcomes_str.startswith('F') and 'P' in outcomes_str:
+        if not first_passed and self.pass_count > 0:
             return "initially_failing"
-        elif outcomes_str.startswith('P') and 'F' in outcomes_str:
+        elif first_passed and non_pass_count > 0:
             return "initially_passing"
-        elif outcomes_str.count('F') < 3:
+        elif non_pass_count < 3:
             return "rarely_failing"
-        elif outcomes_str.count('P') < 3:
+        elif self.pass_count < 3:
             return "rarely_passing"
         else:
             return "intermittent"
 
 
+class _ResultCollector:
+    """pytest plugin that records outcomes in memory, as the JSON report would"""
+
+    def __init__(self):
+        self._results: Dict[str, TestResult] = {}
+        # The pytest-repeat repetition of each result, where it has one
+        self.repeat_steps: Dict[str, int] = {}
+
+    @property
+    def results(self) -> List[TestResult]:
+        return list(self._results.values())
+
+    @property
+    def nodeids(self) -> List[str]:
+        """Node IDs of the results, in the same order"""
+        return list(self._results)
+
+    def pytest_runtest_logreport(self, report) -> None:
+        if report.when == "call" or (report.when == "setup" and not report.passed):
+            if hasattr(report, "wasxfail"):
+                outcome = "xfailed" if report.skipped else "xpassed"
+            elif report.when == "setup" and report.failed:
+                outcome = "error"
+            else:
+                outcome = report.outcome
+
+            properties = dict(report.user_properties)
+            if REPEAT_STEP in properties:
+                self.repeat_steps[report.nodeid] = properties[REPEAT_STEP]
+
+            self._results[report.nodeid] = TestResult(
+                test_id=properties.get(BASE_NODEID, report.nodeid),
+                outcome=outcome,
+                duration=report.duration,
+                error_message=str(report.longrepr)[:200] if report.when == "call" and report.failed else ""
+            )
+        elif report.when == "teardown" and report.failed:
+            # A failing teardown turns a passed test into an error
+            result = self._results.get(report.nodeid)
+            if result and result.outcome == "passed":
+                result.outcome = "error"
+
+
 class FlakyDetector:
     """Main detection engine"""
 
-    def __init__(self, test_path: str, runs: int = 10, verbose: bool = False):
+    def __init__(self, test_path: str, runs: int = 10, verbose: bool = False,
+                 fused: bool = False, workers: Optional[str] = None):
+        """
+        Args:
+            test_path: Path to test file or directory
+            runs: Number of times to run each test
+            verbose: Print progress while running
+            fused: Run all repetitions in one pytest session (pytest-repeat)
+                instead of one pytest process per run
+            workers: Number of pytest-xdist workers ("auto" or a count)
+        """
         self.test_path = Path(test_path).resolve()
         self.runs = runs
         self.verbose = verbose
+        self.fused = fused
+        self.workers = workers
         self.results: Dict[str, FlakyTest] = {}
-        self.temp_dir = tempfile.mkdtemp()
+        # Holds the JSON reports; on tmpfs where available, so reports
+        # never touch the disk. Removed by close(), or when collected
+        self._temp_dir = tempfile.TemporaryDirectory(
+            prefix="flaky-detector-", dir="/dev/shm" if Path("/dev/shm").is_dir() else None
+        )
+        self.temp_dir = self._temp_dir.name
         # Store current working directory - pytest runs from here
         self.pytest_cwd = Path.cwd()
 
+    def __enter__(self) -> "FlakyDetector":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        """Remove the temporary directory holding the pytest reports"""
+        self._temp_dir.cleanup()
+
     def run_detection(self) -> Dict[str, FlakyTest]:
         """Execute detection by running tests multiple times"""
+        if self.workers and importlib.util.find_spec("xdist") is None:
+            raise RuntimeError(
+                "Running tests on workers needs pytest-xdist "
+                "(pip install 'flaky-test-detector[parallel]')"
+            )
+
         if self.verbose:
             print(f"Running tests {self.runs} times...")
             print(f"Test path: {self.test_path}")
             print("-" * 60)
 
+        if self.fused:
+            if self.verbose:
+                print(f"Running all {self.runs} runs in one pytest session...", flush=True)
+
+            # Tests with their own repeat marker may add runs
+            fused_runs = self._execute_fused_runs()
+            for run_num, results in enumerate(fused_runs, 1):
+                self._process_results(results)
+
+                if self.verbose:
+                    print(f"Run {run_num}/{len(fused_runs)}... ✓ ({len(results)} tests)")
+
+            return self.results
+
         for run_num in range(1, self.runs + 1):
             if self.verbose:
                 print(f"Run {run_num}/{self.runs}...", end=" ", flush=True)
@@ -113,7 +247,70 @@ class FlakyDetector:
 
     def _execute_single_run(self) -> List[TestResult]:
         """Execute a single test run"""
-        report_file = Path(self.temp_dir) / f"report_{id(self)}.json"
+        return self._run_pytest([])
+
+    def _execute_fused_runs(self) -> List[List[TestResult]]:
+        """Execute all runs in a single pytest session, returning results per run
+
+        pytest-repeat repeats the whole session, so collection and imports
+        happen once instead of once per run, and pytest runs inside this
+        interpreter rather than a subprocess. The runs share that
+        interpreter, though: module state and the hash seed carry over
+        between them, which is why this mode is opt-in.
+        """
+        collector = self._run_pytest_in_process([
+            f"--count={self.runs}",
+            "--repeat-scope=session",
+            # Tags results with their repetition, in xdist workers too
+            "-p", "flaky_test_detector._repeat_step",
+        ])
+
+        # Results are grouped by run rather than kept in report order,
+        # which xdist workers may interleave. pytest-repeat leaves tests
+        # alone when repeating once, and a test's own repeat marker may ask
+        # for more runs than the others get; tests it did not repeat ran
+        # in the first run
+        steps = [collector.repeat_steps.get(nodeid, 0) for nodeid in collector.nodeids]
+        runs: List[List[TestResult]] = [[] for _ in range(max([self.runs - 1, *steps]) + 1)]
+        for step, result in zip(steps, collector.results):
+            runs[step].append(result)
+
+        return runs
+
+    def _run_pytest_in_process(self, extra_args: List[str]) -> _ResultCollector:
+        """Run pytest in this interpreter and collect results through a plugin"""
+        collector = _ResultCollector()
+        args = [
+            str(self.test_path),
+            "-q",
+            "--tb=short",
+            "--disable-warnings",
+            "-p", "no:cacheprovider",
+            *extra_args,
+        ]
+        if self.workers:
+            args += ["-n", self.workers]
+
+        # No JSON report round trip; like the subprocess runs, pytest's own
+        # output is not shown, and no bytecode is written for the session
+        dont_write_bytecode = sys.dont_write_bytecode
+        sys.dont_write_bytecode = True
+        output = io.StringIO()
+        try:
+            with contextlib.redirect_stdout(output), contextlib.redirect_stderr(output):
+                exit_code = pytest.main(args, plugins=[collector])
+        finally:
+            sys.dont_write_bytecode = dont_write_bytecode
+
+        _check_exit_code(exit_code, output.getvalue())
+        return collector
+
+    def _run_pytest(self, extra_args: List[str]) -> List[TestResult]:
+        """Run pytest once and return the results from its JSON report"""
+        report_file = Path(self.temp_dir) / "report.json"
+        # Every run writes the same file, so a run that produces no report
+        # must not read the previous run's
+        report_file.unlink(missing_ok=True)
 
         cmd = [
             "pytest",
@@ -124,7 +321,12 @@ class FlakyDetector:
             "--tb=short",
             "-q",
             "--disable-warnings",
+            # The detector never reuses pytest's cache between runs
+            "-p", "no:cacheprovider",
+            *extra_args,
         ]
+        if self.workers:
+            cmd += ["-n", self.workers]
 
         # Run pytest (suppress output unless verbose)
         # Don't change cwd - run from current directory so paths match
@@ -133,15 +335,14 @@ class FlakyDetector:
             capture_output=True,
             text=True
         )
+        _check_exit_code(result.returncode, result.stdout + result.stderr)
 
-        # Parse JSON report
+        # Parse JSON report, decoding the raw bytes in one step rather
+        # than through a text-mode file
         try:
-            with open(report_file, "r") as f:
-                report = json.load(f)
+            report = json.loads(report_file.read_bytes())
         except (FileNotFoundError, json.JSONDecodeError) as e:
-            if self.verbose:
-                print(f"\nWarning: Could not read report: {e}")
-            return []
+            raise RuntimeError(f"Could not read the pytest report: {e}") from e
 
         # Extract test results
         test_results = []
@@ -164,10 +365,10 @@ class FlakyDetector:
         for result in results:
             test_id = result.test_id
 
-            # Parse test ID
+            # Parse test ID; names are interned as every run repeats them
             parts = test_id.split("::")
-            test_file = parts[0] if parts else "unknown"
-            test_function = parts[-1] if parts else "unknown"
+            test_file = sys.intern(parts[0]) if parts else "unknown"
+            test_function = sys.intern(parts[-1]) if parts else "unknown"
 
             # Initialize if new test
             if test_id not in self.results:
@@ -179,7 +380,7 @@ class FlakyDetector:
 
             # Update test data
             flaky_test = self.results[test_id]
-            flaky_test.outcomes.append(result.outcome)
+            flaky_test.outcomes.append(_OUTCOME_CODES.get(result.outcome, OUTCOME_OTHER))
 
             if result.outcome == "passed":
                 flaky_test.pass_count += 1
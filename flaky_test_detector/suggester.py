@@ -1,62 +1,38 @@
 """
 Repair suggester - Provides actionable fixes for flaky tests
+
+Every suggestion is a module-level RepairSuggestion constant. A suggestion
+that applies to several root cause types is listed under each of them as
+the same object, so duplicates are recognized by identity.
 """
 
-from typing import List
+from typing import Dict, Iterable, Iterator, List, Tuple
 from dataclasses import dataclass
 
 from .analyzer import FlakinessType, RootCause
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class RepairSuggestion:
-    """A suggested fix for a flaky test"""
+    """A suggested fix for a flaky test
+
+    Immutable, as each instance is shared by every call that suggests it
+    """
     title: str
     description: str
     code_example: str
     priority: int  # 1-3, 1 = high priority
 
 
-class RepairSuggester:
-    """Generates repair suggestions based on root causes"""
+# The suggestions for each kind of root cause are built once, at import,
+# and shared by every call to RepairSuggester.suggest_repairs
 
-    def suggest_repairs(self, causes: List[RootCause]) -> List[RepairSuggestion]:
-        """Generate repair suggestions for identified root causes"""
-        suggestions = []
-
-        for cause in causes:
-            if cause.type == FlakinessType.TIME_DEPENDENT:
-                suggestions.extend(self._suggest_time_fixes())
-            elif cause.type == FlakinessType.RANDOM_DEPENDENT:
-                suggestions.extend(self._suggest_random_fixes())
-            elif cause.type == FlakinessType.CONCURRENCY:
-                suggestions.extend(self._suggest_concurrency_fixes())
-            elif cause.type == FlakinessType.UNORDERED_COLLECTION:
-                suggestions.extend(self._suggest_order_fixes())
-            elif cause.type == FlakinessType.EXTERNAL_DEPENDENCY:
-                suggestions.extend(self._suggest_external_fixes())
-            elif cause.type == FlakinessType.FLOATING_POINT:
-                suggestions.extend(self._suggest_float_fixes())
-            elif cause.type == FlakinessType.GLOBAL_STATE:
-                suggestions.extend(self._suggest_global_state_fixes())
-
-        # Remove duplicates
-        seen = set()
-        unique_suggestions = []
-        for suggestion in suggestions:
-            if suggestion.title not in seen:
-                seen.add(suggestion.title)
-                unique_suggestions.append(suggestion)
-
-        return sorted(unique_suggestions, key=lambda s: s.priority)
-
-    def _suggest_time_fixes(self) -> List[RepairSuggestion]:
-        """Suggestions for time-dependent tests"""
-        return [
-            RepairSuggestion(
-                title="Mock datetime.now() with freezegun",
-                description="Use freezegun to freeze time during test execution",
-                code_example="""# Install: pip install freezegun
+# Suggestions for time-dependent tests
+_TIME_FIXES = (
+    RepairSuggestion(
+        title="Mock datetime.now() with freezegun",
+        description="Use freezegun to freeze time during test execution",
+        code_example="""# Install: pip install freezegun
 from freezegun import freeze_time
 
 @freeze_time("2024-01-15 12:00:00")
@@ -64,12 +40,12 @@ def test_something():
     # Now datetime.now() always returns 2024-01-15 12:00:00
     result = my_function()
     assert result.date == datetime(2024, 1, 15)""",
-                priority=1
-            ),
-            RepairSuggestion(
-                title="Inject time as parameter",
-                description="Pass time as a parameter instead of calling datetime.now() inside code",
-                code_example="""# Instead of:
+        priority=1
+    ),
+    RepairSuggestion(
+        title="Inject time as parameter",
+        description="Pass time as a parameter instead of calling datetime.now() inside code",
+        code_example="""# Instead of:
 def process():
     now = datetime.now()
     return now.hour > 12
@@ -84,28 +60,28 @@ def process(current_time=None):
 def test_process():
     test_time = datetime(2024, 1, 15, 14, 0)
     assert process(test_time) == True""",
-                priority=1
-            ),
-        ]
-
-    def _suggest_random_fixes(self) -> List[RepairSuggestion]:
-        """Suggestions for random-dependent tests"""
-        return [
-            RepairSuggestion(
-                title="Set random seed before test",
-                description="Fix the random seed to make tests deterministic",
-                code_example="""import random
+        priority=1
+    ),
+)
+
+
+# Suggestions for random-dependent tests
+_RANDOM_FIXES = (
+    RepairSuggestion(
+        title="Set random seed before test",
+        description="Fix the random seed to make tests deterministic",
+        code_example="""import random
 
 def test_something():
     random.seed(42)  # Always same sequence
     result = my_random_function()
     assert result == expected_value""",
-                priority=1
-            ),
-            RepairSuggestion(
-                title="Use pytest fixtures for random data",
-                description="Generate random test data in fixtures with fixed seed",
-                code_example="""import pytest
+        priority=1
+    ),
+    RepairSuggestion(
+        title="Use pytest fixtures for random data",
+        description="Generate random test data in fixtures with fixed seed",
+        code_example="""import pytest
 import random
 
 @pytest.fixture
@@ -116,28 +92,28 @@ def random_data():
 def test_something(random_data):
     result = process(random_data)
     assert result == expected""",
-                priority=1
-            ),
-            RepairSuggestion(
-                title="Mock random module",
-                description="Mock the random module to return predetermined values",
-                code_example="""from unittest.mock import patch
+        priority=1
+    ),
+    RepairSuggestion(
+        title="Mock random module",
+        description="Mock the random module to return predetermined values",
+        code_example="""from unittest.mock import patch
 
 def test_something():
     with patch('random.randint', return_value=42):
         result = my_function()
         assert result == expected""",
-                priority=2
-            ),
-        ]
-
-    def _suggest_concurrency_fixes(self) -> List[RepairSuggestion]:
-        """Suggestions for concurrency issues"""
-        return [
-            RepairSuggestion(
-                title="Add proper synchronization",
-                description="Use locks, events, or other synchronization primitives",
-                code_example="""import threading
+        priority=2
+    ),
+)
+
+
+# Suggestions for concurrency issues
+_CONCURRENCY_FIXES = (
+    RepairSuggestion(
+        title="Add proper synchronization",
+        description="Use locks, events, or other synchronization primitives",
+        code_example="""import threading
 
 lock = threading.Lock()
 
@@ -155,23 +131,23 @@ def test_concurrent():
         t.join()
 
     assert len(results) == 5""",
-                priority=1
-            ),
-            RepairSuggestion(
-                title="Use pytest-asyncio for async tests",
-                description="Properly handle async tests with pytest-asyncio",
-                code_example="""import pytest
+        priority=1
+    ),
+    RepairSuggestion(
+        title="Use pytest-asyncio for async tests",
+        description="Properly handle async tests with pytest-asyncio",
+        code_example="""import pytest
 
 @pytest.mark.asyncio
 async def test_async_function():
     result = await my_async_function()
     assert result == expected""",
-                priority=1
-            ),
-            RepairSuggestion(
-                title="Add timeouts and retries",
-                description="Add explicit timeouts for async operations",
-                code_example="""import asyncio
+        priority=1
+    ),
+    RepairSuggestion(
+        title="Add timeouts and retries",
+        description="Add explicit timeouts for async operations",
+        code_example="""import asyncio
 
 async def test_with_timeout():
     try:
@@ -182,17 +158,17 @@ async def test_with_timeout():
         assert result == expected
     except asyncio.TimeoutError:
         pytest.fail("Operation timed out")""",
-                priority=2
-            ),
-        ]
-
-    def _suggest_order_fixes(self) -> List[RepairSuggestion]:
-        """Suggestions for order-dependent tests"""
-        return [
-            RepairSuggestion(
-                title="Sort collections before comparison",
-                description="Convert to sorted lists for deterministic ordering",
-                code_example="""# Instead of:
+        priority=2
+    ),
+)
+
+
+# Suggestions for order-dependent tests
+_ORDER_FIXES = (
+    RepairSuggestion(
+        title="Sort collections before comparison",
+        description="Convert to sorted lists for deterministic ordering",
+        code_example="""# Instead of:
 assert result == {1, 2, 3}
 
 # Do this:
@@ -200,12 +176,12 @@ assert sorted(result) == [1, 2, 3]
 
 # Or for dicts:
 assert sorted(result.items()) == sorted(expected.items())""",
-                priority=1
-            ),
-            RepairSuggestion(
-                title="Use ordered collections",
-                description="Replace set/dict with list/OrderedDict when order matters",
-                code_example="""from collections import OrderedDict
+        priority=1
+    ),
+    RepairSuggestion(
+        title="Use ordered collections",
+        description="Replace set/dict with list/OrderedDict when order matters",
+        code_example="""from collections import OrderedDict
 
 # Instead of:
 data = {'a': 1, 'b': 2}
@@ -215,17 +191,17 @@ data = OrderedDict([('a', 1), ('b', 2)])
 
 # Or just use a list of tuples:
 data = [('a', 1), ('b', 2)]""",
-                priority=1
-            ),
-        ]
-
-    def _suggest_external_fixes(self) -> List[RepairSuggestion]:
-        """Suggestions for external dependency issues"""
-        return [
-            RepairSuggestion(
-                title="Mock external dependencies",
-                description="Use mocks instead of real external calls",
-                code_example="""from unittest.mock import patch, Mock
+        priority=1
+    ),
+)
+
+
+# Suggestions for external dependency issues
+_EXTERNAL_FIXES = (
+    RepairSuggestion(
+        title="Mock external dependencies",
+        description="Use mocks instead of real external calls",
+        code_example="""from unittest.mock import patch, Mock
 
 def test_api_call():
     mock_response = Mock()
@@ -234,12 +210,12 @@ def test_api_call():
     with patch('requests.get', return_value=mock_response):
         result = my_function_that_calls_api()
         assert result['status'] == 'ok'""",
-                priority=1
-            ),
-            RepairSuggestion(
-                title="Use pytest fixtures for test files",
-                description="Create temporary files in fixtures",
-                code_example="""import pytest
+        priority=1
+    ),
+    RepairSuggestion(
+        title="Use pytest fixtures for test files",
+        description="Create temporary files in fixtures",
+        code_example="""import pytest
 from pathlib import Path
 
 @pytest.fixture
@@ -251,12 +227,12 @@ def test_file(tmp_path):
 def test_read_file(test_file):
     content = read_file(test_file)
     assert content == "test content" """,
-                priority=1
-            ),
-            RepairSuggestion(
-                title="Use responses library for HTTP",
-                description="Mock HTTP requests with the responses library",
-                code_example="""import responses
+        priority=1
+    ),
+    RepairSuggestion(
+        title="Use responses library for HTTP",
+        description="Mock HTTP requests with the responses library",
+        code_example="""import responses
 import requests
 
 @responses.activate
@@ -270,17 +246,17 @@ def test_api():
 
     result = fetch_data()
     assert result['status'] == 'ok'""",
-                priority=2
-            ),
-        ]
-
-    def _suggest_float_fixes(self) -> List[RepairSuggestion]:
-        """Suggestions for floating point comparison issues"""
-        return [
-            RepairSuggestion(
-                title="Use pytest.approx for float comparison",
-                description="Compare floats with tolerance using pytest.approx",
-                code_example="""import pytest
+        priority=2
+    ),
+)
+
+
+# Suggestions for floating point comparison issues
+_FLOAT_FIXES = (
+    RepairSuggestion(
+        title="Use pytest.approx for float comparison",
+        description="Compare floats with tolerance using pytest.approx",
+        code_example="""import pytest
 
 # Instead of:
 assert result == 0.1 + 0.2  # May fail!
@@ -290,29 +266,29 @@ assert result == pytest.approx(0.3)
 
 # Or with custom tolerance:
 assert result == pytest.approx(0.3, abs=1e-6)""",
-                priority=1
-            ),
-            RepairSuggestion(
-                title="Use math.isclose()",
-                description="Use math.isclose() for relative/absolute tolerance",
-                code_example="""import math
+        priority=1
+    ),
+    RepairSuggestion(
+        title="Use math.isclose()",
+        description="Use math.isclose() for relative/absolute tolerance",
+        code_example="""import math
 
 # Instead of:
 assert a == b
 
 # Do this:
 assert math.isclose(a, b, rel_tol=1e-9, abs_tol=1e-9)""",
-                priority=1
-            ),
-        ]
-
-    def _suggest_global_state_fixes(self) -> List[RepairSuggestion]:
-        """Suggestions for global state issues"""
-        return [
-            RepairSuggestion(
-                title="Reset global state in fixtures",
-                description="Use pytest fixtures to reset state before/after tests",
-                code_example="""import pytest
+        priority=1
+    ),
+)
+
+
+# Suggestions for global state issues
+_GLOBAL_STATE_FIXES = (
+    RepairSuggestion(
+        title="Reset global state in fixtures",
+        description="Use pytest fixtures to reset state before/after tests",
+        code_example="""import pytest
 
 @pytest.fixture(autouse=True)
 def reset_global_state():
@@ -325,22 +301,22 @@ def reset_global_state():
 def test_something():
     MyClass.global_var = 'new_value'
     # Test will not affect other tests""",
-                priority=1
-            ),
-            RepairSuggestion(
-                title="Mock environment variables",
-                description="Use monkeypatch to temporarily set environment variables",
-                code_example="""def test_with_env_var(monkeypatch):
+        priority=1
+    ),
+    RepairSuggestion(
+        title="Mock environment variables",
+        description="Use monkeypatch to temporarily set environment variables",
+        code_example="""def test_with_env_var(monkeypatch):
     monkeypatch.setenv('MY_VAR', 'test_value')
     result = my_function()
     assert result == expected
     # Environment is automatically restored""",
-                priority=1
-            ),
-            RepairSuggestion(
-                title="Use dependency injection",
-                description="Pass dependencies as parameters instead of using globals",
-                code_example="""# Instead of:
+        priority=1
+    ),
+    RepairSuggestion(
+        title="Use dependency injection",
+        description="Pass dependencies as parameters instead of using globals",
+        code_example="""# Instead of:
 CONFIG = {'debug': True}
 
 def process():
@@ -356,6 +332,69 @@ def process(config=None):
 def test_process():
     result = process(config={'debug': True})
     assert result == expected""",
-                priority=2
-            ),
-        ]
+        priority=2
+    ),
+)
+
+
+# Suggestions per root cause type; types without any have no entry
+_DISPATCH: Dict[FlakinessType, Tuple[RepairSuggestion, ...]] = {
+    FlakinessType.TIME_DEPENDENT: _TIME_FIXES,
+    FlakinessType.RANDOM_DEPENDENT: _RANDOM_FIXES,
+    FlakinessType.CONCURRENCY: _CONCURRENCY_FIXES,
+    FlakinessType.UNORDERED_COLLECTION: _ORDER_FIXES,
+    FlakinessType.EXTERNAL_DEPENDENCY: _EXTERNAL_FIXES,
+    FlakinessType.FLOATING_POINT: _FLOAT_FIXES,
+    FlakinessType.GLOBAL_STATE: _GLOBAL_STATE_FIXES,
+}
+
+
+class RepairSuggester:
+    """Generates repair suggestions based on root causes"""
+
+    def __init__(self):
+        # Suggestions per distinct cause types, in order of first appearance;
+        # a handful of combinations cover the causes of most tests
+        self._cache: Dict[Tuple[FlakinessType, ...], Tuple[RepairSuggestion, ...]] = {}
+
+    def suggest_repairs(self, causes: List[RootCause]) -> List[RepairSuggestion]:
+        """Generate repair suggestions for identified root causes"""
+        return next(self.suggest_repairs_many([causes]))
+
+    def suggest_repairs_many(self, cause_lists: Iterable[List[RootCause]]) -> Iterator[List[RepairSuggestion]]:
+        """Generate repair suggestions for the root causes of each of many tests
+
+        Yields one list per list of causes, lazily and in order. Tests with
+        the same combination of cause types share one cache entry.
+        """
+        cache = self._cache
+        for causes in cause_lists:
+            # Several causes of one type would only repeat its suggestions,
+            # so each type is looked up once, in order of first appearance.
+            # That order, not just the set of types, decides the result: it
+            # orders suggestions of equal priority
+            cause_types = tuple(dict.fromkeys(cause.type for cause in causes))
+            suggestions = cache.get(cause_types)
+            if suggestions is None:
+                suggestions = cache[cause_types] = self._rank_suggestions(cause_types)
+            yield list(suggestions)
+
+    @staticmethod
+    def _rank_suggestions(cause_types: Tuple[FlakinessType, ...]) -> Tuple[RepairSuggestion, ...]:
+        """Unique suggestions for the given cause types, by priority"""
+        # Suggestions shared between types are the same object (see the
+        # module docstring), so they collapse onto their id, in order of
+        # first appearance
+        unique = {
+            id(suggestion): suggestion
+            for cause_type in cause_types
+            for suggestion in _DISPATCH.get(cause_type, ())
+        }
+
+        # Priorities are 1-3, so ordering by priority is a matter of
+        # placing each suggestion in its bucket rather than sorting
+        buckets: Tuple[List[RepairSuggestion], ...] = ([], [], [])
+        for suggestion in unique.values():
+            buckets[suggestion.priority - 1].append(suggestion)
+
+        return (*buckets[0], *buckets[1], *buckets[2])